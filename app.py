@@ -2,13 +2,13 @@
 
 import sys
 import argparse
-import time
 from pathlib import Path
 from PySide6.QtWidgets import QApplication
 from PySide6.QtGui import QIcon
 
 from mtg.collection import CollectionManager
-from mtg.external_data import ExternalDataProvider
+from mtg.colors import format_colors
+from mtg.external_data import ArchidektDeckMerger, get_external_provider
 from mtg.deckbuilder import DeckBuilder
 from mtg.validators import DeckValidator
 from mtg.exporter import DeckExporter
@@ -37,23 +37,37 @@ class Launcher(object):
     def setup(self):
         """Fonction principale."""
         # Initialisation des composants
-        self.collection_manager = CollectionManager()
-        self.external_provider = ExternalDataProvider()
+        self.external_provider = get_external_provider()
+        self.collection_manager = CollectionManager(external_provider=self.external_provider)
         self.excluded_card_names: set[str] = set()
         self.current_language = "fr"
 
     def import_collection(self):
-        """Importe une collection depuis un fichier CSV."""
+        """Importe une collection depuis un fichier CSV (les cartes s'ajoutent à la collection)."""
+        self._load_collection_file("Import de collection", self.collection_manager.load_from_csv, resumable=True)
+
+    def sync_collection(self):
+        """Synchronise la collection avec un fichier CSV.
+
+        Les cartes du fichier prennent les quantités du fichier et celles qui
+        en ont été retirées depuis la synchronisation précédente sont
+        supprimées (voir ``CollectionManager.sync_from_csv``).
+        """
+        self._load_collection_file("Synchronisation de collection", self.collection_manager.sync_from_csv)
+
+    def _load_collection_file(self, title, load, **kwargs):
+        """Demande un fichier CSV puis le charge via ``load`` en affichant la progression."""
         file_path, import_type = self.window.get_csv_path_for_import_in_db()
         if file_path:
-            # progression: afficher un QProgressDialog indéterminé puis borné si possible
-            self.window.show_progress("Import de collection", "Lecture du fichier...")
+            # progression : pourcentage du fichier lu
+            self.window.show_progress(title, "Lecture du fichier...", maximum=100)
             try:
-                self.collection_manager.load_from_csv(
+                load(
                     file_path,
                     import_type,
                     progress_cb=self.window.update_progress,
                     label_cb=self.window.set_progress_label,
+                    **kwargs,
                 )
                 self.window.set_progress_label("Rafraîchissement de l'interface...")
                 self.update_collection_list()
@@ -63,17 +77,16 @@ class Launcher(object):
 
     def update_collection_list(self):
         """Mise à jour de la liste des cartes dans la fenêtre."""
-        cards = self.collection_manager.get_all_cards()
-        # Alimente l'onglet avec données + filtres
-        if hasattr(self.window, "set_collection_cards"):
-            self.window.set_collection_cards(cards)
+        # Alimente l'onglet avec filtres + première page de données
+        if hasattr(self.window, "reload_collection"):
+            self.window.reload_collection()
             # Rafraîchir la langue pour recharger les libellés des filtres avec les nouvelles valeurs
             if hasattr(self.window, "apply_language"):
                 self.window.apply_language(getattr(self.window, "language", "fr"))
         else:
             self.window.collection_list.clear()
-            for card in cards:
-                self.window.collection_list.addItem(' / '.join([card["name"], card["colors"], card["types"], str(card["quantity"]), card["set_name"], str(card["collector_number"])]))
+            for card in self.collection_manager.get_all_cards():
+                self.window.collection_list.addItem(' / '.join([card["name"], format_colors(card["color_mask"]), card["types"], str(card["quantity"]), card["set_name"], str(card["collector_number"])]))
 
     def set_language(self, lang: str):
         """Change la langue de l'interface et rafraîchit les textes."""
@@ -84,7 +97,7 @@ class Launcher(object):
     def export_collection(self):
         """Exporte la collection vers un fichier CSV."""
         file_path = self.window.get_save_file_name(
-            "Exporter la collection", "collection.csv", "CSV files (*.csv)"
+            "Exporter la collection", "collection.csv", "CSV files (*.csv);;CSV gzip (*.csv.gz)"
         )
         if file_path:
             self.collection_manager.export_db_to_csv(file_path)
@@ -123,32 +136,22 @@ class Launcher(object):
             self.window.deck_found_table.setRowCount(0)
         deck_search_params = self.window.numb_deck_search.currentIndex()
 
-        decks_id = self.external_provider.get_archidekt_decks_id_for_commander(commander_name, order_by)
-        numbers_decks = len(decks_id)
-        match deck_search_params:
-            case 0:
-                len_decks = round(numbers_decks/3)
-            case 1:
-                len_decks = round(numbers_decks*2/3)
-            case 2:
-                len_decks = numbers_decks
-        cards = {}
-        self.window.show_progress("Recherche de decks", "Chargement des decks Archidekt...", maximum=len_decks or 0)
+        # Taille d'échantillon visée (Faible / Moyen / Élevé)
+        target = cts.ARCHIDEKT_SAMPLE_SIZES[deck_search_params]
+        listing = self.external_provider.get_archidekt_deck_listing(commander_name, order_by, target=target)
+        merger = ArchidektDeckMerger()
+        len_decks = 0
+        self.window.show_progress("Recherche de decks", "Chargement des decks Archidekt...", maximum=target)
         try:
-            for idx, deck_id in enumerate(decks_id[:len_decks], start=1):
-                time.sleep(0.1)
-                deck = self.external_provider.load_archidekt_deck(deck_id)
-
-                for name, info in deck.items():
-                    if name in cards:
-                        # on cumule les occurences (nb de decks où la carte apparaît)
-                        cards[name]["occurence"] += info.get("occurence", 1)
-                    else:
-                        # première fois qu'on voit cette carte
-                        cards[name] = info
-                self.window.update_progress(idx)
+            # Les pages du listing sont parcourues pendant les téléchargements
+            decks = self.external_provider.iter_archidekt_decks(listing)
+            for len_decks, (deck_index, deck) in enumerate(decks, start=1):
+                merger.add(deck_index, deck)
+                self.window.update_progress(len_decks)
         finally:
             self.window.close_progress()
+        numbers_decks = listing.total or len_decks
+        cards = merger.cards
 
         owned = self.collection_manager.compare_deck_to_collection(cards)
         owned = self._apply_exclusions(owned)
@@ -164,7 +167,9 @@ class Launcher(object):
     def build_deck(self):
         """Construit un deck Commander valide à partir d'une liste scorée."""
         commander_name = self.window.commander_input.currentText()
-        deck_builder = DeckBuilder(self, commander_name, self._apply_exclusions(self.eventual_owned))
+        deck_builder = DeckBuilder(
+            self, commander_name, self._apply_exclusions(self.eventual_owned), external_provider=self.external_provider
+        )
         self.window.show_progress("Construction du deck", "Génération en cours...", maximum=100)
         try:
             deck = deck_builder.build_deck()
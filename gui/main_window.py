@@ -1,7 +1,5 @@
 from functools import partial
 from pathlib import Path
-import time
-import requests
 from typing import Optional, List, Dict
 from PySide6.QtWidgets import (
     QApplication,
@@ -33,7 +31,10 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QPixmap, QPainter, QIcon
+from mtg.colors import colors_to_mask, format_colors
 from mtg.constants import VERSION
+from mtg.external_data import get_external_provider
+from mtg.http_client import get_http_client
 
 class MainWindow(QMainWindow):
     """Fenêtre principale de l'application."""
@@ -41,6 +42,7 @@ class MainWindow(QMainWindow):
     def __init__(self, app):
         super().__init__()
         self.app = app
+        self.external_provider = getattr(app, "external_provider", None) or get_external_provider()
         self.setWindowTitle(f"MTG Commander Deck Builder - Version {VERSION}")
         self.setWindowIcon(QIcon("C:\\Users\\paris\\OneDrive\\Documents\\Project code\\MTG_generator\\gui\\resource\\icons8-boule-de-cristal-magique-100.png"))
         self.setMinimumSize(1980, 1200)
@@ -50,8 +52,12 @@ class MainWindow(QMainWindow):
         self.missing_image_indices = []
         self.preview_label = None
         self.roles_available = set()
-        self.collection_cards = []
+        self.collection_total = 0
+        self.collection_filter_colors: List[str] = []
+        self.collection_filter_types: List[str] = []
         self.filtered_collection_cards: List[Dict] = []
+        self._collection_query: Dict = {}
+        self._collection_cursor = None
         self.eventual_cards_data: List[Dict] = []
         self.filtered_eventual_cards: List[Dict] = []
         self.deck_cards_data: List[Dict] = []
@@ -78,6 +84,7 @@ class MainWindow(QMainWindow):
                 "collection_tab_title": "Ma Collection",
                 "collection_label": "Nom / Couleur / Type / Quantité / Nom du set / Numéro de la carte",
                 "btn_import": "Importer une collection",
+                "btn_sync": "Synchroniser une collection",
                 "btn_export": "Exporter la collection",
                 "btn_delete": "Supprimer la collection",
                 "btn_reset_filters": "Réinitialiser les filtres",
@@ -126,6 +133,7 @@ class MainWindow(QMainWindow):
                 "collection_tab_title": "My Collection",
                 "collection_label": "Name / Color / Type / Quantity / Set name / Collector number",
                 "btn_import": "Import collection",
+                "btn_sync": "Sync collection",
                 "btn_export": "Export collection",
                 "btn_delete": "Delete collection",
                 "btn_reset_filters": "Reset filters",
@@ -499,10 +507,12 @@ class MainWindow(QMainWindow):
         # Boutons d'import/export
         btn_layout = QHBoxLayout()
         self.import_btn = QPushButton("Importer une collection")
+        self.sync_btn = QPushButton("Synchroniser une collection")
         self.export_btn = QPushButton("Exporter la collection")
         self.delete_btn = QPushButton("Supprimer la collection")
         self.clear_filters_btn = QPushButton("Réinitialiser les filtres")
         btn_layout.addWidget(self.import_btn)
+        btn_layout.addWidget(self.sync_btn)
         btn_layout.addWidget(self.export_btn)
         btn_layout.addWidget(self.delete_btn)
         btn_layout.addStretch()
@@ -528,6 +538,8 @@ class MainWindow(QMainWindow):
         self.collection_table.setEditTriggers(self.collection_table.EditTrigger.NoEditTriggers)
         self.collection_table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.collection_table.customContextMenuRequested.connect(self.show_collection_context_menu)
+        # Les pages suivantes sont chargées à l'approche du bas du tableau
+        self.collection_table.verticalScrollBar().valueChanged.connect(self._on_collection_scrolled)
 
         # Recherche et filtres
         filters_row = QHBoxLayout()
@@ -554,6 +566,7 @@ class MainWindow(QMainWindow):
         layout.addWidget(self.collection_table)
 
         self.import_btn.clicked.connect(self.app.import_collection)
+        self.sync_btn.clicked.connect(self.app.sync_collection)
         self.export_btn.clicked.connect(self.app.export_collection)
         self.delete_btn.clicked.connect(self.app.delete_collection)
         self.collection_search.textChanged.connect(self.refresh_collection_list)
@@ -564,80 +577,59 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(tab, "Ma Collection")
 
     # --- Collection helpers ---
-    def set_collection_cards(self, cards: List[Dict]):
-        """Réceptionne les cartes et (re)charge filtres + liste."""
-        self.collection_cards = cards or []
+    def reload_collection(self):
+        """Recharge filtres et liste depuis la base (la liste est paginée)."""
+        manager = self.app.collection_manager
+        self.collection_total = manager.query_cards(limit=0).total
+        self.collection_filter_colors, self.collection_filter_types = manager.get_collection_filter_values()
         self._update_collection_filters()
         self.refresh_collection_list()
 
     def _update_collection_filters(self):
-        colors = set()
-        types = set()
-        for card in self.collection_cards:
-            colors_field = str(card.get("colors", "")).replace("[", "").replace("]", "").replace("'", "")
-            for part in colors_field.split(','):
-                val = part.strip()
-                if val:
-                    colors.add(val)
-            types_field = card.get("types") or ""
-            main_type = types_field.split(" — ")[0].strip()
-            if main_type:
-                types.add(main_type)
-
         self.collection_color_filter.blockSignals(True)
         self.collection_color_filter.clear()
         self.collection_color_filter.addItem("Toutes les couleurs")
-        for c in sorted(colors):
+        for c in self.collection_filter_colors:
             self.collection_color_filter.addItem(c)
         self.collection_color_filter.blockSignals(False)
 
         self.collection_type_filter.blockSignals(True)
         self.collection_type_filter.clear()
         self.collection_type_filter.addItem("Tous les types")
-        for t in sorted(types):
+        for t in self.collection_filter_types:
             self.collection_type_filter.addItem(t)
         self.collection_type_filter.blockSignals(False)
 
     def refresh_collection_list(self):
-        """Applique recherche/filtre et met à jour la liste + résumé."""
-        query = self.collection_search.text().strip().lower() if hasattr(self, "collection_search") else ""
-        color_filter = self.collection_color_filter.currentText() if hasattr(self, "collection_color_filter") else "Toutes les couleurs"
-        type_filter = self.collection_type_filter.currentText() if hasattr(self, "collection_type_filter") else "Tous les types"
+        """Applique recherche/filtre, charge la première page et met à jour le résumé."""
+        query = self.collection_search.text().strip()
+        # L'entrée 0 des filtres correspond à « toutes les valeurs »
+        color_filter = self.collection_color_filter
+        type_filter = self.collection_type_filter
+        self._collection_query = {
+            "color_mask": colors_to_mask(color_filter.currentText()) if color_filter.currentIndex() > 0 else None,
+            "card_type": type_filter.currentText() if type_filter.currentIndex() > 0 else None,
+            "text": query or None,
+        }
+        page = self.app.collection_manager.query_cards(**self._collection_query)
 
         self.collection_table.setRowCount(0)
-        filtered_cards: List[Dict] = []
-        total_qty = 0
-
-        for card in self.collection_cards:
-            name = card.get("name", "")
-            set_name = card.get("set_name", "")
-            collector_number = str(card.get("collector_number", ""))
-            colors_field = str(card.get("colors", "")).replace("[", "").replace("]", "").replace("'", "")
-            types_field = card.get("types", "")
-
-            if query:
-                target = " ".join([name, set_name, collector_number]).lower()
-                if query not in target:
-                    continue
+        self.filtered_collection_cards = []
+        self._append_collection_page(page)
 
-            if color_filter != "Toutes les couleurs":
-                color_tokens = {c.strip() for c in colors_field.split(',') if c.strip()}
-                if color_filter not in color_tokens:
-                    continue
-
-            if type_filter != "Tous les types":
-                if type_filter.lower() not in types_field.lower():
-                    continue
-
-            filtered_cards.append(card)
-            total_qty += int(card.get("quantity", 0) or 0)
+        summary_text = f"{page.total} cartes filtrées sur {self.collection_total} ( {page.total_quantity} exemplaires )"
+        self.collection_summary.setText(summary_text)
 
-        self.filtered_collection_cards = filtered_cards
+    def _append_collection_page(self, page):
+        """Ajoute les cartes d'une page à la fin du tableau de la collection."""
+        self._collection_cursor = page.next_cursor
+        start = len(self.filtered_collection_cards)
+        self.filtered_collection_cards.extend(page.cards)
 
-        self.collection_table.setRowCount(len(filtered_cards))
-        for row, card in enumerate(filtered_cards):
+        self.collection_table.setRowCount(len(self.filtered_collection_cards))
+        for row, card in enumerate(page.cards, start):
             name = card.get("name", "")
-            colors_field = str(card.get("colors", "")).replace("[", "").replace("]", "").replace("'", "")
+            colors_field = format_colors(card.get("color_mask"))
             types_field = card.get("types", "") or "-"
             qty = str(card.get("quantity", 0))
             set_name = card.get("set_name", "")
@@ -656,10 +648,16 @@ class MainWindow(QMainWindow):
                     item.setTextAlignment(Qt.AlignCenter)
                 self.collection_table.setItem(row, col, item)
 
-        unique_total = len(self.collection_cards)
-        filtered_total = len(filtered_cards)
-        summary_text = f"{filtered_total} cartes filtrées sur {unique_total} ( {total_qty} exemplaires )"
-        self.collection_summary.setText(summary_text)
+    def _on_collection_scrolled(self, value: int):
+        """Charge la page suivante quand le bas du tableau devient visible."""
+        if self._collection_cursor is None:
+            return
+        scrollbar = self.collection_table.verticalScrollBar()
+        if value >= scrollbar.maximum() - scrollbar.pageStep():
+            page = self.app.collection_manager.query_cards(
+                **self._collection_query, after=self._collection_cursor, count=False
+            )
+            self._append_collection_page(page)
 
     def clear_collection_filters(self):
         """Réinitialise recherche et filtres collection."""
@@ -699,9 +697,9 @@ class MainWindow(QMainWindow):
         url = card.get("image_url")
         if not url:
             scryfall_id = card.get("scryfall_id")
-            if scryfall_id and hasattr(self.app, "external_provider"):
+            if scryfall_id:
                 try:
-                    url = self.app.external_provider.get_image_url_from_scryfall(scryfall_id)
+                    url = self.external_provider.get_image_url_from_scryfall(scryfall_id)
                 except Exception:
                     url = None
         if not url:
@@ -709,7 +707,7 @@ class MainWindow(QMainWindow):
             return
 
         try:
-            resp = requests.get(url)
+            resp = get_http_client().get(url)
             resp.raise_for_status()
             pix = QPixmap()
             pix.loadFromData(resp.content)
@@ -872,6 +870,7 @@ class MainWindow(QMainWindow):
         # Collection tab
         self.label_collection.setText(t["collection_label"])
         self.import_btn.setText(t["btn_import"])
+        self.sync_btn.setText(t["btn_sync"])
         self.export_btn.setText(t["btn_export"])
         self.delete_btn.setText(t["btn_delete"])
         self.clear_filters_btn.setText(t["btn_reset_filters"])
@@ -882,9 +881,7 @@ class MainWindow(QMainWindow):
         self.collection_color_filter.blockSignals(True)
         self.collection_color_filter.clear()
         self.collection_color_filter.addItem(t["collection_color_all"])
-        for c in sorted({
-            part.strip() for card in self.collection_cards for part in str(card.get("colors", "")).replace("[","").replace("]","").replace("'","").split(',') if part.strip()
-        }):
+        for c in self.collection_filter_colors:
             self.collection_color_filter.addItem(c)
         idx_color = self.collection_color_filter.findText(current_color)
         self.collection_color_filter.setCurrentIndex(idx_color if idx_color != -1 else 0)
@@ -894,9 +891,8 @@ class MainWindow(QMainWindow):
         self.collection_type_filter.blockSignals(True)
         self.collection_type_filter.clear()
         self.collection_type_filter.addItem(t["collection_type_all"])
-        for typ in sorted({(card.get("types") or "").split(" — ")[0].strip() for card in self.collection_cards if card.get("types") }):
-            if typ:
-                self.collection_type_filter.addItem(typ)
+        for typ in self.collection_filter_types:
+            self.collection_type_filter.addItem(typ)
         idx_type = self.collection_type_filter.findText(current_type)
         self.collection_type_filter.setCurrentIndex(idx_type if idx_type != -1 else 0)
         self.collection_type_filter.blockSignals(False)
@@ -961,8 +957,9 @@ class MainWindow(QMainWindow):
             if widget is not None:
                 widget.setParent(None)
 
-    def show_deck_images(self, cards_data, external_provider):
+    def show_deck_images(self, cards_data, external_provider=None):
         """Affiche les images du deck, 3 par ligne."""
+        external_provider = external_provider or self.external_provider
         # Demande à l'utilisateur s'il souhaite charger les images
         reply = QMessageBox.question(
             self,
@@ -1000,8 +997,7 @@ class MainWindow(QMainWindow):
                 if not url:
                     self.missing_image_indices.append(idx)
                     continue
-                time.sleep(0.075)
-                resp = requests.get(url)
+                resp = get_http_client().get(url)
                 resp.raise_for_status()
                 pix = QPixmap()
                 pix.loadFromData(resp.content)
@@ -1047,7 +1043,7 @@ class MainWindow(QMainWindow):
 
         def _load_pixmap(url: str) -> Optional[QPixmap]:
             try:
-                resp = requests.get(url)
+                resp = get_http_client().get(url)
                 resp.raise_for_status()
                 pix = QPixmap()
                 pix.loadFromData(resp.content)
@@ -1058,7 +1054,7 @@ class MainWindow(QMainWindow):
         def _get_face_urls(scryfall_id: str) -> list[str]:
             urls: list[str] = []
             try:
-                data = self.app.external_provider.get_scryfall_data(scryfall_id)
+                data = self.external_provider.get_scryfall_data(scryfall_id)
             except Exception:
                 return urls
             if not data:
@@ -1232,7 +1228,7 @@ class MainWindow(QMainWindow):
         for row, card in enumerate(self.filtered_eventual_cards):
             values = [
                 card.get("name", ""),
-                str(card.get("colors", "")).replace("[", "").replace("]", "").replace("'", ""),
+                format_colors(card.get("color_mask")),
                 card.get("types", ""),
                 str(card.get("edhrec_rank", "")),
                 str(card.get("occurence", "")),
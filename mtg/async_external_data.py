@@ -0,0 +1,152 @@
+"""Variante asynchrone (asyncio) du fournisseur de données externes."""
+
+import asyncio
+import threading
+import weakref
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from mtg import constants as cts
+from mtg.external_data import ExternalDataProvider, get_external_provider
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncExternalDataProvider:
+    """Fournisseur awaitable au-dessus d'``ExternalDataProvider``.
+
+    Les appels bloquants (transport, cache, catalogue) sont exécutés dans un
+    pool de threads dédié, ce qui partage caches et limiteurs de débit avec
+    le fournisseur synchrone. Le nombre de requêtes en vol est borné par
+    ``max_concurrency`` ; l'annulation d'une tâche abandonne les appels
+    encore en attente.
+
+    Attributes:
+        provider: Fournisseur synchrone sous-jacent
+        max_concurrency: Nombre maximal d'appels simultanés
+    """
+
+    def __init__(self, provider: Optional[ExternalDataProvider] = None,
+                 max_concurrency: int = cts.ARCHIDEKT_MAX_WORKERS) -> None:
+        self.provider = provider if provider is not None else get_external_provider()
+        self.max_concurrency = max(1, max_concurrency)
+        # Un sémaphore par boucle asyncio (un sémaphore est lié à sa boucle)
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="mtg-async")
+
+    async def _run(self, func, *args):
+        """Exécute ``func(*args)`` dans le pool, dans la limite de concurrence."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        async with semaphore:
+            return await loop.run_in_executor(self._executor, partial(func, *args))
+
+    async def get_archidekt_decks_id_for_commander(self, commander_name: str, order_by: str,
+                                                   target: Optional[int] = None) -> List[str]:
+        """Version awaitable de ``get_archidekt_decks_id_for_commander`` (ids matérialisés)."""
+        def _collect() -> List[str]:
+            return list(self.provider.get_archidekt_decks_id_for_commander(commander_name, order_by, target))
+        return await self._run(_collect)
+
+    async def load_archidekt_deck(self, id: str, updated_at: Optional[str] = None) -> Dict:
+        """Version awaitable de ``load_archidekt_deck``."""
+        return await self._run(self.provider.load_archidekt_deck, id, updated_at)
+
+    async def get_scryfall_data(self, identifier: str) -> Dict:
+        """Version awaitable de ``get_scryfall_data``."""
+        return await self._run(self.provider.get_scryfall_data, identifier)
+
+    async def get_image_url_from_scryfall(self, scryfall_id: str) -> Optional[str]:
+        """Version awaitable de ``get_image_url_from_scryfall``."""
+        return await self._run(self.provider.get_image_url_from_scryfall, scryfall_id)
+
+    async def iter_archidekt_decks(self, decks_id: List[str],
+                                   updated_at: Optional[Dict[str, str]] = None) -> AsyncIterator[Tuple[int, Dict]]:
+        """Charge plusieurs decks en parallèle et les renvoie au fil de l'eau.
+
+        Si l'itération est interrompue (annulation, exception), les
+        téléchargements restants sont annulés.
+
+        Yields:
+            Tuple[int, dict]: (rang du deck dans ``decks_id``, cartes du deck)
+        """
+        updated_at = updated_at or {}
+
+        async def _load(idx: int, deck_id: str) -> Tuple[int, Dict]:
+            return idx, await self.load_archidekt_deck(deck_id, updated_at.get(deck_id))
+
+        tasks = [asyncio.ensure_future(_load(idx, deck_id)) for idx, deck_id in enumerate(decks_id)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def close(self) -> None:
+        """Arrête le pool de threads (les appels en attente sont abandonnés)."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class BlockingExternalDataProvider:
+    """Façade synchrone d'``AsyncExternalDataProvider``.
+
+    Les coroutines sont exécutées sur une boucle asyncio privée, dans un
+    thread dédié ; les méthodes ont la même signature que celles
+    d'``ExternalDataProvider``, ce qui permet de l'utiliser à sa place (par
+    exemple dans ``Launcher``). Les autres attributs sont délégués au
+    fournisseur synchrone sous-jacent.
+    """
+
+    def __init__(self, async_provider: Optional[AsyncExternalDataProvider] = None) -> None:
+        self.async_provider = async_provider if async_provider is not None else AsyncExternalDataProvider()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="mtg-async-loop", daemon=True)
+        self._thread.start()
+
+    def __getattr__(self, name):
+        if name == "async_provider":
+            raise AttributeError(name)
+        return getattr(self.async_provider.provider, name)
+
+    def _call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def get_archidekt_decks_id_for_commander(self, commander_name: str, order_by: str,
+                                             target: Optional[int] = None) -> List[str]:
+        return self._call(self.async_provider.get_archidekt_decks_id_for_commander(commander_name, order_by, target))
+
+    def load_archidekt_deck(self, id: str, updated_at: Optional[str] = None) -> Dict:
+        return self._call(self.async_provider.load_archidekt_deck(id, updated_at))
+
+    def get_scryfall_data(self, identifier: str) -> Dict:
+        return self._call(self.async_provider.get_scryfall_data(identifier))
+
+    def get_image_url_from_scryfall(self, scryfall_id: str) -> Optional[str]:
+        return self._call(self.async_provider.get_image_url_from_scryfall(scryfall_id))
+
+    def iter_archidekt_decks(self, decks_id: List[str],
+                             updated_at: Optional[Dict[str, str]] = None) -> Iterator[Tuple[int, Dict]]:
+        """Équivalent synchrone d'``AsyncExternalDataProvider.iter_archidekt_decks``."""
+        agen = self.async_provider.iter_archidekt_decks(decks_id, updated_at)
+        try:
+            while True:
+                try:
+                    yield self._call(agen.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            self._call(agen.aclose())
+
+    def close(self) -> None:
+        """Arrête la boucle asyncio et le pool de threads."""
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self.async_provider.close()
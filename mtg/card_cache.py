@@ -0,0 +1,120 @@
+"""Cache mémoire borné des données de cartes Scryfall."""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from mtg import constants as cts
+
+# Tailles d'image conservées dans la projection
+_IMAGE_SIZES = ("normal", "large", "png")
+
+
+def _project_image_uris(image_uris: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
+    if not image_uris:
+        return None
+    return {size: image_uris[size] for size in _IMAGE_SIZES if image_uris.get(size)}
+
+
+def project_card(card_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Réduit les données Scryfall d'une carte aux champs lus par le projet.
+
+    Args:
+        card_data: Objet carte complet renvoyé par Scryfall
+
+    Returns:
+        dict: ``id``, ``oracle_id``, ``name``, ``type_line``,
+        ``oracle_text``, ``color_identity``, ``cmc``, ``image_uris`` et, pour
+        les cartes multi-faces, ``card_faces`` (nom, texte et images de
+        chaque face).
+    """
+    projected: Dict[str, Any] = {
+        "id": card_data.get("id"),
+        "oracle_id": card_data.get("oracle_id"),
+        "name": card_data.get("name"),
+        "type_line": card_data.get("type_line"),
+        "oracle_text": card_data.get("oracle_text"),
+        "color_identity": card_data.get("color_identity") or [],
+        "cmc": card_data.get("cmc"),
+    }
+    image_uris = _project_image_uris(card_data.get("image_uris"))
+    if image_uris:
+        projected["image_uris"] = image_uris
+    faces = card_data.get("card_faces")
+    if faces:
+        projected["card_faces"] = [
+            {key: value for key, value in (
+                ("name", face.get("name")),
+                ("oracle_text", face.get("oracle_text")),
+                ("image_uris", _project_image_uris(face.get("image_uris"))),
+            ) if value}
+            for face in faces
+        ]
+    return projected
+
+
+class CardCache:
+    """Cache LRU des projections de cartes, borné en entrées et en octets.
+
+    Attributes:
+        max_entries: Nombre maximal de cartes conservées
+        max_bytes: Taille maximale estimée (JSON compact) des cartes conservées
+        hits: Nombre de lectures servies par le cache
+        misses: Nombre de lectures absentes du cache
+    """
+
+    def __init__(self, max_entries: int = cts.SCRYFALL_CACHE_MAX_ENTRIES,
+                 max_bytes: int = cts.SCRYFALL_CACHE_MAX_BYTES) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """Taille estimée des cartes conservées."""
+        return self._size
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Retourne la carte associée à ``key`` (None si absente)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, card_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Stocke la projection de ``card_data`` et la retourne."""
+        projected = project_card(card_data)
+        size = len(json.dumps(projected, separators=(",", ":")))
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[key] = (projected, size)
+            self._size += size
+            while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+        return projected
+
+    def stats(self) -> Dict[str, int]:
+        """Compteurs du cache (succès, échecs, entrées, octets)."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "bytes": self._size}
+
+    def clear(self) -> None:
+        """Vide le cache (les compteurs sont conservés)."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
@@ -0,0 +1,170 @@
+"""Catalogue local des cartes construit depuis le fichier bulk Scryfall."""
+
+import json
+import sqlite3
+import threading
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from mtg import constants as cts
+from mtg.utils import normalize_card_name, is_uuid_like
+
+logger = logging.getLogger(__name__)
+
+
+class CardCatalog:
+    """Index SQLite des cartes Scryfall, alimenté une seule fois par le bulk.
+
+    Le fichier ``oracle-cards.json`` est ingéré dans une base indexée par
+    ``scryfall_id`` et nom normalisé (y compris le nom de chaque face). Le bulk n'est relu que si le fichier source a changé.
+
+    Attributes:
+        db_path: Chemin de la base SQLite du catalogue
+        bulk_path: Chemin du fichier bulk Scryfall (JSON)
+    """
+
+    def __init__(self, db_path: Optional[str] = None, bulk_path: Optional[str] = None) -> None:
+        self.db_path = Path(db_path or cts.CATALOG_DB_PATH)
+        self.bulk_path = Path(bulk_path or cts.SCRYFALL_BULK)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._ready: Optional[bool] = None
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Retourne la connexion au catalogue (créée à la demande)."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS catalog_cards (
+                    scryfall_id TEXT PRIMARY KEY,
+                    oracle_id TEXT,
+                    data TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS catalog_names (
+                    name_norm TEXT NOT NULL,
+                    scryfall_id TEXT NOT NULL,
+                    PRIMARY KEY (name_norm, scryfall_id)
+                );
+                CREATE TABLE IF NOT EXISTS catalog_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            """)
+        return self._conn
+
+    def _bulk_signature(self) -> Optional[str]:
+        """Signature (taille + date de modification) du fichier bulk."""
+        try:
+            stat = self.bulk_path.stat()
+        except OSError:
+            return None
+        return f"{stat.st_size}:{int(stat.st_mtime)}"
+
+    def ensure_loaded(self) -> bool:
+        """S'assure que le catalogue est à jour par rapport au fichier bulk.
+
+        Returns:
+            True si le catalogue contient des cartes, False sinon
+        """
+        if self._ready is not None:
+            return self._ready
+        with self._lock:
+            if self._ready is not None:
+                return self._ready
+            signature = self._bulk_signature()
+            if signature is None and not self.db_path.exists():
+                self._ready = False
+                return False
+            conn = self._get_connection()
+            row = conn.execute("SELECT value FROM catalog_meta WHERE key = 'bulk_signature'").fetchone()
+            if signature is not None and (row is None or row["value"] != signature):
+                self._ingest(conn, signature)
+            count = conn.execute("SELECT COUNT(*) AS count FROM catalog_cards").fetchone()["count"]
+            self._ready = count > 0
+            return self._ready
+
+    def _ingest(self, conn: sqlite3.Connection, signature: str) -> None:
+        """Recharge intégralement le catalogue depuis le fichier bulk."""
+        logger.info(f"Construction du catalogue local depuis {self.bulk_path}")
+        with open(self.bulk_path, "r", encoding="utf-8") as f:
+            cards = json.load(f)
+
+        def _names(card: Dict) -> Iterable[str]:
+            yield card.get("name", "")
+            for face in card.get("card_faces") or []:
+                yield face.get("name", "")
+
+        with conn:
+            conn.execute("DELETE FROM catalog_cards")
+            conn.execute("DELETE FROM catalog_names")
+            conn.executemany(
+                "INSERT OR REPLACE INTO catalog_cards (scryfall_id, oracle_id, data) VALUES (?, ?, ?)",
+                (
+                    (card["id"], card.get("oracle_id"), json.dumps(card, separators=(",", ":")))
+                    for card in cards if card.get("id")
+                ),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO catalog_names (name_norm, scryfall_id) VALUES (?, ?)",
+                (
+                    (normalize_card_name(name), card["id"])
+                    for card in cards if card.get("id")
+                    for name in _names(card) if name
+                ),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO catalog_meta (key, value) VALUES ('bulk_signature', ?)",
+                (signature,),
+            )
+        logger.info(f"Catalogue local construit : {len(cards)} cartes")
+
+    def _fetch_one(self, query: str, params: tuple) -> Optional[Dict]:
+        if not self.ensure_loaded():
+            return None
+        with self._lock:
+            row = self._get_connection().execute(query, params).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def get_by_scryfall_id(self, scryfall_id: str) -> Optional[Dict]:
+        """Retourne la carte correspondant à un ``scryfall_id``."""
+        return self._fetch_one(
+            "SELECT data FROM catalog_cards WHERE scryfall_id = ?",
+            (scryfall_id.lower(),),
+        )
+
+    def get_by_name(self, name: str) -> Optional[Dict]:
+        """Retourne une carte par nom exact (insensible à la casse, faces incluses)."""
+        return self._fetch_one(
+            """
+            SELECT c.data FROM catalog_names n
+            JOIN catalog_cards c ON c.scryfall_id = n.scryfall_id
+            WHERE n.name_norm = ?
+            LIMIT 1
+            """,
+            (normalize_card_name(name),),
+        )
+
+    def lookup(self, identifier: str) -> Optional[Dict]:
+        """Recherche une carte par ``scryfall_id`` (UUID) ou par nom exact.
+
+        Args:
+            identifier: ``scryfall_id`` ou nom exact de la carte
+
+        Returns:
+            Les données Scryfall de la carte, ou None si absente du catalogue
+        """
+        if not identifier:
+            return None
+        if is_uuid_like(identifier):
+            return self.get_by_scryfall_id(identifier)
+        return self.get_by_name(identifier)
+
+    def close(self) -> None:
+        """Ferme la connexion au catalogue."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
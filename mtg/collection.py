@@ -2,37 +2,403 @@
 
 import sqlite3
 import csv
+import gzip
+import hashlib
+import io
+import itertools
 import json
+import os
+import re
+import time
 
+from dataclasses import dataclass
 from typing import Tuple
 from pathlib import Path
 from typing import List, Dict, Optional, Any, Set
 import logging
 from mtg import constants as cts
-from mtg.external_data import ExternalDataProvider
+from mtg.colors import color_mask_sql, colors_to_mask, mask_to_colors
+from mtg.db import ConnectionManager
+from mtg.external_data import ExternalDataProvider, SCRYFALL_COLLECTION_BATCH, get_external_provider
 
 logger = logging.getLogger(__name__)
 
+# Requêtes d'insertion utilisées par l'import CSV
+# (les colonnes dérivées sont calculées à l'insertion, sans passer par les
+# triggers de rattrapage)
+_MANABOX_INSERT = """
+    INSERT OR IGNORE INTO cards 
+    (name, colors, types, scryfall_id, oracle_id, set_code, set_name, collector_number, image_url,
+        foil, rarity, quantity, card_condition, language, is_commander_eligible, color_mask, name_norm)
+    VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9, ?10, ?11, ?12, ?13, ?14, ?15, ?16, LOWER(TRIM(?1)))
+"""
+_MOXFIELD_INSERT = """
+    INSERT OR IGNORE INTO cards 
+    (name, scryfall_id, colors, types, quantity, color_mask, is_commander_eligible, name_norm)
+    VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, LOWER(TRIM(?1)))
+"""
+
+# Créature légendaire d'après la ligne de types (1 ou 0)
+_LEGENDARY_CREATURE_SQL = "COALESCE(LOWER({types}) LIKE '%legendary%' AND LOWER({types}) LIKE '%creature%', 0)"
+
+# Possession agrégée : une ligne par oracle_id (sinon par nom normalisé)
+# regroupant toutes les impressions possédées d'une carte
+_OWNERSHIP_KEY_SQL = "COALESCE({t}.oracle_id, LOWER(TRIM({t}.name)))"
+
+# Maintenance incrémentale de ``card_ownership`` : les triggers appliquent la
+# variation de quantité et ne recherchent l'impression de référence (avec
+# image, la plus possédée, puis la plus ancienne) que si la carte modifiée
+# l'est ou le devient. Les imports stockent '' pour une image absente. Le masque de couleurs est celui de la référence,
+# recalculé depuis ``colors`` pour ne pas dépendre de l'ordre des triggers.
+_OWNERSHIP_RANK_SQL = "NULLIF({t}.image_url, '') IS NULL, -{t}.quantity, {t}.id"
+_OWNERSHIP_REFERENCE_COLUMNS = "best_id, name, name_norm, color_mask, colors, types, scryfall_id, image_url"
+
+
+def _ownership_reference_sql(t: str) -> str:
+    """Valeurs des colonnes de référence (``_OWNERSHIP_REFERENCE_COLUMNS``) tirées de la carte ``t``."""
+    return (
+        f"{t}.id, {t}.name, LOWER(TRIM({t}.name)), {color_mask_sql(f'{t}.colors')}, "
+        f"{t}.colors, {t}.types, {t}.scryfall_id, {t}.image_url"
+    )
+
+
+def _ownership_pick_sql(where: str) -> str:
+    """Requête choisissant l'impression de référence des lignes de possession filtrées par ``where``."""
+    return f"""
+        UPDATE card_ownership SET ({_OWNERSHIP_REFERENCE_COLUMNS}) = (
+            SELECT {_ownership_reference_sql("b")} FROM cards b
+            WHERE {_OWNERSHIP_KEY_SQL.format(t="b")} = card_ownership.owner_key
+            ORDER BY {_OWNERSHIP_RANK_SQL.format(t="b")} LIMIT 1
+        )
+        {where};
+    """
+
+
+def _ownership_promote_sql(row: str) -> str:
+    """Requête faisant de la carte ``row`` la référence de son groupe si elle passe devant."""
+    return f"""
+        UPDATE card_ownership SET ({_OWNERSHIP_REFERENCE_COLUMNS}) = ({_ownership_reference_sql(row)})
+        WHERE owner_key = {_OWNERSHIP_KEY_SQL.format(t=row)} AND best_id != {row}.id
+            AND ({_OWNERSHIP_RANK_SQL.format(t=row)}) < (
+                SELECT {_OWNERSHIP_RANK_SQL.format(t="b")} FROM cards b WHERE b.id = card_ownership.best_id
+            );
+    """
+
+
+def _ownership_add_sql(row: str) -> str:
+    """Corps de trigger ajoutant la carte ``row`` (NEW) à son groupe de possession."""
+    key = _OWNERSHIP_KEY_SQL.format(t=row)
+    return f"""
+        INSERT INTO card_ownership (owner_key, oracle_id, quantity, printings, {_OWNERSHIP_REFERENCE_COLUMNS})
+        VALUES ({key}, {row}.oracle_id, {row}.quantity, 1, {_ownership_reference_sql(row)})
+        ON CONFLICT(owner_key) DO UPDATE SET quantity = quantity + excluded.quantity, printings = printings + 1;
+        {_ownership_promote_sql(row)}
+    """
+
+
+def _ownership_remove_sql(row: str) -> str:
+    """Corps de trigger retirant la carte ``row`` (OLD) de son groupe de possession."""
+    key = _OWNERSHIP_KEY_SQL.format(t=row)
+    return f"""
+        UPDATE card_ownership SET quantity = quantity - {row}.quantity, printings = printings - 1
+        WHERE owner_key = {key};
+        DELETE FROM card_ownership WHERE owner_key = {key} AND printings <= 0;
+        {_ownership_pick_sql(f"WHERE owner_key = {key} AND best_id = {row}.id")}
+    """
+
+
+# Migrations du schéma de la base de collection, appliquées dans l'ordre.
+# ``PRAGMA user_version`` contient le nombre de migrations déjà appliquées.
+_SCHEMA_MIGRATIONS: List[str] = [
+    # 1 : nom normalisé stocké (maintenu par triggers) et index de recherche.
+    # Les imports renseignent name_norm eux-mêmes : le trigger d'insertion ne
+    # rattrape que les lignes insérées sans (anciens outils, SQL brut).
+    """
+    ALTER TABLE cards ADD COLUMN name_norm TEXT;
+    UPDATE cards SET name_norm = LOWER(TRIM(name));
+    CREATE TRIGGER cards_name_norm_insert AFTER INSERT ON cards
+    WHEN NEW.name_norm IS NOT LOWER(TRIM(NEW.name)) BEGIN
+        UPDATE cards SET name_norm = LOWER(TRIM(NEW.name)) WHERE id = NEW.id;
+    END;
+    CREATE TRIGGER cards_name_norm_update AFTER UPDATE OF name ON cards BEGIN
+        UPDATE cards SET name_norm = LOWER(TRIM(NEW.name)) WHERE id = NEW.id;
+    END;
+    CREATE INDEX idx_cards_name_norm ON cards(name_norm);
+    CREATE INDEX idx_cards_oracle_id ON cards(oracle_id);
+    CREATE INDEX idx_cards_scryfall_id ON cards(scryfall_id);
+    """,
+    # 2 : identité couleur en masque de bits (voir ``mtg.colors``), calculée
+    # par ``colors_to_mask`` à l'import ; le trigger d'insertion ne rattrape
+    # que les lignes insérées sans
+    f"""
+    ALTER TABLE cards ADD COLUMN color_mask INTEGER NOT NULL DEFAULT 0;
+    UPDATE cards SET color_mask = {color_mask_sql("colors")};
+    CREATE TRIGGER cards_color_mask_insert AFTER INSERT ON cards
+    WHEN NEW.color_mask != {color_mask_sql("NEW.colors")} BEGIN
+        UPDATE cards SET color_mask = {color_mask_sql("NEW.colors")} WHERE id = NEW.id;
+    END;
+    CREATE TRIGGER cards_color_mask_update AFTER UPDATE OF colors ON cards BEGIN
+        UPDATE cards SET color_mask = {color_mask_sql("NEW.colors")} WHERE id = NEW.id;
+    END;
+    """,
+    # 3 : cartes pouvant être commandant, calculées par
+    # ``_is_commander_eligible`` à l'import (y compris les cartes dont le texte
+    # l'autorise, « can be your commander »). Le trigger d'insertion ne
+    # rattrape que les créatures légendaires insérées sans.
+    f"""
+    ALTER TABLE cards ADD COLUMN is_commander_eligible INTEGER NOT NULL DEFAULT 0;
+    UPDATE cards SET is_commander_eligible = {_LEGENDARY_CREATURE_SQL.format(types="types")};
+    CREATE TRIGGER cards_commander_insert AFTER INSERT ON cards
+    WHEN NEW.is_commander_eligible < {_LEGENDARY_CREATURE_SQL.format(types="NEW.types")} BEGIN
+        UPDATE cards SET is_commander_eligible = 1 WHERE id = NEW.id;
+    END;
+    CREATE TRIGGER cards_commander_update AFTER UPDATE OF types ON cards BEGIN
+        UPDATE cards
+        SET is_commander_eligible = MAX(NEW.is_commander_eligible, {_LEGENDARY_CREATURE_SQL.format(types="NEW.types")})
+        WHERE id = NEW.id;
+    END;
+    CREATE INDEX idx_cards_commander ON cards(is_commander_eligible, name_norm);
+    """,
+    # 4 : index plein texte (FTS5, contenu externe synchronisé par triggers)
+    """
+    CREATE VIRTUAL TABLE cards_fts USING fts5(
+        name, types, set_name, collector_number,
+        content='cards', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    );
+    INSERT INTO cards_fts(cards_fts) VALUES ('rebuild');
+    CREATE TRIGGER cards_fts_insert AFTER INSERT ON cards BEGIN
+        INSERT INTO cards_fts (rowid, name, types, set_name, collector_number)
+        VALUES (NEW.id, NEW.name, NEW.types, NEW.set_name, NEW.collector_number);
+    END;
+    CREATE TRIGGER cards_fts_delete AFTER DELETE ON cards BEGIN
+        INSERT INTO cards_fts (cards_fts, rowid, name, types, set_name, collector_number)
+        VALUES ('delete', OLD.id, OLD.name, OLD.types, OLD.set_name, OLD.collector_number);
+    END;
+    CREATE TRIGGER cards_fts_update AFTER UPDATE OF name, types, set_name, collector_number ON cards BEGIN
+        INSERT INTO cards_fts (cards_fts, rowid, name, types, set_name, collector_number)
+        VALUES ('delete', OLD.id, OLD.name, OLD.types, OLD.set_name, OLD.collector_number);
+        INSERT INTO cards_fts (rowid, name, types, set_name, collector_number)
+        VALUES (NEW.id, NEW.name, NEW.types, NEW.set_name, NEW.collector_number);
+    END;
+    """,
+    # 5 : synchronisation des fichiers importés (empreinte du fichier et de
+    # chaque ligne, carte correspondante)
+    """
+    CREATE TABLE import_sources (
+        source TEXT PRIMARY KEY,
+        import_type TEXT NOT NULL,
+        file_hash TEXT,
+        synced_at REAL NOT NULL
+    );
+    CREATE TABLE import_rows (
+        source TEXT NOT NULL,
+        row_key TEXT NOT NULL,
+        row_hash TEXT NOT NULL,
+        card_id INTEGER NOT NULL,
+        PRIMARY KEY (source, row_key)
+    );
+    CREATE INDEX idx_import_rows_card ON import_rows(card_id);
+    -- Une carte supprimée hors synchronisation invalide l'empreinte de sa source
+    CREATE TRIGGER cards_import_rows_delete AFTER DELETE ON cards BEGIN
+        UPDATE import_sources SET file_hash = NULL
+        WHERE source IN (SELECT source FROM import_rows WHERE card_id = OLD.id);
+        DELETE FROM import_rows WHERE card_id = OLD.id;
+    END;
+    """,
+    # 6 : possession agrégée par carte (toutes impressions confondues),
+    # maintenue par variations ; la mise à jour de color_mask (qui suit
+    # celle de colors) ne la déclenche pas
+    f"""
+    CREATE TABLE card_ownership (
+        owner_key TEXT PRIMARY KEY,
+        oracle_id TEXT,
+        name TEXT NOT NULL,
+        name_norm TEXT NOT NULL,
+        quantity INTEGER NOT NULL,
+        printings INTEGER NOT NULL,
+        color_mask INTEGER NOT NULL,
+        colors TEXT,
+        types TEXT,
+        scryfall_id TEXT,
+        image_url TEXT,
+        best_id INTEGER
+    );
+    CREATE INDEX idx_card_ownership_name_norm ON card_ownership(name_norm);
+    CREATE INDEX idx_cards_owner_key ON cards(COALESCE(oracle_id, LOWER(TRIM(name))));
+    INSERT INTO card_ownership (owner_key, oracle_id, name, name_norm, quantity, printings, color_mask)
+    SELECT {_OWNERSHIP_KEY_SQL.format(t="c")}, MAX(c.oracle_id), MIN(c.name), '', SUM(c.quantity), COUNT(*), 0
+    FROM cards c GROUP BY 1;
+    {_ownership_pick_sql("")}
+    CREATE TRIGGER cards_ownership_insert AFTER INSERT ON cards BEGIN
+        {_ownership_add_sql("NEW")}
+    END;
+    CREATE TRIGGER cards_ownership_delete AFTER DELETE ON cards BEGIN
+        {_ownership_remove_sql("OLD")}
+    END;
+    CREATE TRIGGER cards_ownership_update
+    AFTER UPDATE OF oracle_id, name, quantity, colors, types, scryfall_id, image_url ON cards
+    WHEN {_OWNERSHIP_KEY_SQL.format(t="OLD")} IS {_OWNERSHIP_KEY_SQL.format(t="NEW")} BEGIN
+        UPDATE card_ownership SET quantity = quantity + NEW.quantity - OLD.quantity
+        WHERE owner_key = {_OWNERSHIP_KEY_SQL.format(t="NEW")};
+        {_ownership_pick_sql(f"WHERE owner_key = {_OWNERSHIP_KEY_SQL.format(t='NEW')} AND best_id = NEW.id")}
+        {_ownership_promote_sql("NEW")}
+    END;
+    -- Carte changée de groupe : retirée de l'ancien, ajoutée au nouveau
+    CREATE TRIGGER cards_ownership_regroup AFTER UPDATE OF oracle_id, name ON cards
+    WHEN {_OWNERSHIP_KEY_SQL.format(t="OLD")} IS NOT {_OWNERSHIP_KEY_SQL.format(t="NEW")} BEGIN
+        {_ownership_remove_sql("OLD")}
+        {_ownership_add_sql("NEW")}
+    END;
+    """,
+]
+
+# Colonnes obligatoires par type d'import
+_REQUIRED_COLUMNS: Dict[str, Set[str]] = {
+    "ManaBox - Collection": {'Name', 'Set code', 'Set name', 'Collector number',
+                             'Foil', 'Rarity', 'Quantity', 'Scryfall ID', 'Condition', 'Language'},
+    "Moxfield": {'name', 'scryfall_id', 'colors', 'types', 'quantity'},
+}
+
+# Colonnes (nom, scryfall_id, quantité) identifiant une ligne, par type d'import
+_ROW_KEY_COLUMNS: Dict[str, Tuple[str, str, str]] = {
+    "ManaBox - Collection": ('Name', 'Scryfall ID', 'Quantity'),
+    "Moxfield": ('name', 'scryfall_id', 'quantity'),
+}
+
+# Mise à jour d'une carte suivie par la synchronisation, par type d'import
+# (seules les cartes dont une valeur diffère sont réécrites)
+_SYNC_UPDATES: Dict[str, str] = {
+    "ManaBox - Collection": """
+        UPDATE cards SET quantity = ?1, foil = ?2, rarity = ?3, card_condition = ?4, language = ?5
+        WHERE id = ?6 AND (quantity, foil, rarity, card_condition, language) IS NOT (?1, ?2, ?3, ?4, ?5)
+    """,
+    "Moxfield": """
+        UPDATE cards SET quantity = ?1, colors = ?2, types = ?3
+        WHERE id = ?4 AND (quantity, colors, types) IS NOT (?1, ?2, ?3)
+    """,
+}
+
+# Poids BM25 des colonnes de ``cards_fts`` (le nom prime sur le reste)
+_FTS_RANKING = "bm25(cards_fts, 10.0, 2.0, 1.0, 1.0)"
+
+# Colonnes de l'export CSV, dans l'ordre du fichier
+_EXPORT_CSV_FIELDS = [
+    'name', 'colors', 'types', 'quantity', 'scryfall_id', 'set_code', 'set_name',
+    'collector_number', 'foil', 'rarity', 'card_condition', 'language',
+]
+
+
+def _iter_rows(cursor: sqlite3.Cursor, size: int = cts.EXPORT_FETCH_SIZE):
+    """Parcourt le résultat d'une requête par paquets de ``size`` lignes."""
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield from rows
+
+
+def _open_export(path: str, compress: Optional[bool] = None, newline: Optional[str] = None):
+    """Ouvre un fichier d'export en écriture texte, compressé en gzip si demandé.
+
+    Args:
+        path: Chemin du fichier de sortie
+        compress: Force (ou désactive) la compression ; par défaut, elle est
+            activée si le chemin se termine par ``.gz``
+        newline: Paramètre ``newline`` transmis à ``open``
+    """
+    if compress is None:
+        compress = str(path).lower().endswith(".gz")
+    if compress:
+        return gzip.open(path, "wt", encoding="utf-8", newline=newline)
+    return open(path, "w", encoding="utf-8", newline=newline)
+
+
+class _ImportProgress:
+    """Relaie la progression d'un import en limitant la fréquence des appels.
+
+    La progression est exprimée en pourcentage des octets lus ; les
+    callbacks (qui repeignent l'interface) ne sont appelés qu'au plus une
+    fois par ``interval`` secondes.
+    """
+
+    def __init__(self, label: str, total_bytes: int, progress_cb=None, label_cb=None,
+                 interval: float = cts.IMPORT_PROGRESS_INTERVAL) -> None:
+        self.label = label
+        self.total_bytes = total_bytes
+        self.progress_cb = progress_cb
+        self.label_cb = label_cb
+        self.interval = interval
+        self._last_report = float("-inf")
+
+    def update(self, rows: int, bytes_read: int, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_report < self.interval:
+            return
+        self._last_report = now
+        percent = min(100, bytes_read * 100 // self.total_bytes) if self.total_bytes else 100
+        if self.label_cb:
+            self.label_cb(f"{self.label} ({rows} lignes, {percent} %)")
+        if self.progress_cb:
+            self.progress_cb(percent)
+
+
+# Position dans la liste paginée : (nom normalisé, id) de la dernière carte lue
+PageCursor = Tuple[str, int]
+
+
+@dataclass
+class CardPage:
+    """Page de cartes renvoyée par ``CollectionManager.query_cards``.
+
+    Attributes:
+        cards: Cartes de la page, triées par nom normalisé puis par id
+        next_cursor: Curseur à passer en ``after`` pour lire la page
+            suivante (None s'il s'agit de la dernière)
+        total: Nombre de cartes correspondant aux filtres (None si non compté)
+        total_quantity: Nombre d'exemplaires correspondant aux filtres
+            (None si non compté)
+    """
+
+    cards: List[Dict[str, Any]]
+    next_cursor: Optional[PageCursor]
+    total: Optional[int] = None
+    total_quantity: Optional[int] = None
+
+
+def _fts_match(query: str) -> Optional[str]:
+    """Expression MATCH FTS5 (préfixes de chaque mot), None si la requête est vide."""
+    tokens = re.findall(r"\w+", query)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
 class CollectionManager:
     """Gère la collection de cartes Magic: The Gathering dans une base SQLite.
     
     Attributes:
         csv_path: Chemin vers le fichier CSV source
         db_path: Chemin vers la base de données SQLite
+        external_provider: Fournisseur de données externes (Scryfall)
     """
     
-    def __init__(self):
+    def __init__(self, external_provider: Optional[ExternalDataProvider] = None):
         """Initialise le gestionnaire de collection.
+
+        Args:
+            external_provider: Fournisseur de données externes. Par défaut,
+                le fournisseur partagé du processus.
         """
+        self.external_provider = external_provider if external_provider is not None else get_external_provider()
         self.csv_path = None
         if cts.CSV_PATH:
             self.csv_path = Path(cts.CSV_PATH)
         if cts.DB_PATH:
             self.db_path = Path(cts.DB_PATH)
-        self.conn: Optional[sqlite3.Connection] = None
         
         # Créer le répertoire de la base de données si nécessaire
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = ConnectionManager(self.db_path)
         
         # Initialiser la base de données
         self._init_db()
@@ -43,7 +409,7 @@ class CollectionManager:
 
     def _init_db(self) -> None:
         """Initialise la structure de la base de données si elle n'existe pas."""
-        with self._get_connection() as conn:
+        with self._db.writer() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS cards (
@@ -65,18 +431,52 @@ class CollectionManager:
                     UNIQUE(name, scryfall_id)
                 )
             """)
-            conn.commit()
+            # Reprise des imports interrompus : dernier paquet validé par fichier
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS import_checkpoints (
+                    file_hash TEXT PRIMARY KEY,
+                    import_type TEXT NOT NULL,
+                    row_offset INTEGER NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            # Lignes dont l'enrichissement Scryfall a échoué, à retenter
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS import_retry_queue (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    file_hash TEXT,
+                    row_data TEXT NOT NULL,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 1
+                )
+            """)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        """Met à niveau le schéma d'une base existante (voir ``_SCHEMA_MIGRATIONS``)."""
+        with self._db.writer() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for number, script in enumerate(_SCHEMA_MIGRATIONS[version:], start=version + 1):
+                logger.info(f"Migration du schéma de la collection vers la version {number}")
+                # Chaque migration est appliquée de façon atomique
+                conn.executescript(f"BEGIN; {script} PRAGMA user_version = {number}; COMMIT;")
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Connexion à la base de données du thread courant."""
+        return self._get_connection()
 
     def _get_connection(self) -> sqlite3.Connection:
-        """Retourne une connexion à la base de données.
+        """Retourne la connexion à la base de données du thread courant.
+
+        Chaque thread dispose de sa propre connexion (mode WAL) : les
+        lectures ne sont pas bloquées par une écriture en cours. Les
+        écritures passent par ``self._db.writer()``.
         
         Returns:
             Une connexion SQLite
         """
-        if self.conn is None:
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.row_factory = sqlite3.Row
-        return self.conn
+        return self._db.connection()
 
     def _is_db_empty(self) -> bool:
         """Vérifie si la base de données est vide.
@@ -91,18 +491,21 @@ class CollectionManager:
 
     
 
-    def _get_some_data_from_scryfall(self, scryfall_id: str) -> Tuple[str, list]:
+    def _get_some_data_from_scryfall(self, scryfall_id: str) -> Tuple[str, str, str, list]:
         """Récupère les types et les couleurs d'une carte depuis l'API Scryfall.
         
         Args:
             scryfall_id: L'identifiant de la carte sur Scryfall
         
         Returns:
-            Un tuple contenant (types, couleurs) de la carte
+            Un tuple contenant (oracle_id, image, types, couleurs) de la carte
         """
-        types, colors = None, None
-        
-        card_data = self.external_data_priovider.get_scryfall_data(scryfall_id)
+        card_data = self.external_provider.get_scryfall_data(scryfall_id)
+        return self._extract_card_fields(card_data)
+
+    @staticmethod
+    def _extract_card_fields(card_data: Dict[str, Any]) -> Tuple[str, str, str, list]:
+        """Extrait (oracle_id, image, types, couleurs) des données Scryfall d'une carte."""
         # Extraction des types et couleurs
         oracle_id = card_data.get('oracle_id', '')
         types = card_data.get('type_line', '')
@@ -125,117 +528,493 @@ class CollectionManager:
             colors = ['colorless'] 
         return oracle_id, image, types, colors
 
-    def _load_csv_into_db(self, import_type: str, progress_cb=None, label_cb=None) -> None:
+    @staticmethod
+    def _is_commander_eligible(card_data: Dict[str, Any]) -> bool:
+        """Indique si une carte peut être commandant (créature légendaire ou texte l'autorisant)."""
+        types = (card_data.get('type_line') or '').lower()
+        if 'legendary' in types and 'creature' in types:
+            return True
+        texts = [card_data.get('oracle_text')]
+        texts += [face.get('oracle_text') for face in card_data.get('card_faces') or []]
+        return any('can be your commander' in (text or '').lower() for text in texts)
+
+    def _insert_manabox_rows(self, cursor: sqlite3.Cursor, rows: List[Dict[str, str]],
+                             failed: Optional[List[Tuple[Dict[str, str], str]]] = None) -> int:
+        """Enrichit un paquet de lignes ManaBox via Scryfall puis les insère.
+
+        Les cartes sont d'abord cherchées par nom dans le catalogue local :
+        il ne contient qu'une impression par carte, mais les champs utilisés
+        (oracle_id, types, couleurs) ne dépendent pas de l'impression. Les
+        autres sont récupérées en une seule requête (endpoint
+        ``/cards/collection``) ; seules les cartes non résolues par ce biais
+        donnent lieu à un appel individuel.
+
+        Args:
+            cursor: Curseur SQLite de la transaction d'import
+            rows: Lignes ManaBox à insérer
+            failed: Si fourni, les lignes dont l'enrichissement échoue y sont
+                ajoutées (avec le message d'erreur) au lieu d'interrompre
+                l'import.
+
+        Returns:
+            Le nombre de cartes insérées
+        """
+        ids = [row.get('Scryfall ID', '').strip() for row in rows]
+        catalog = self.external_provider.catalog
+        catalog_data = [catalog.lookup(row.get('Name', '').strip()) for row in rows]
+        remaining = [scryfall_id for scryfall_id, data in zip(ids, catalog_data) if data is None]
+        try:
+            batch_data = self.external_provider.get_scryfall_data_batch(remaining) if remaining else {}
+        except ValueError as e:
+            if failed is None:
+                raise
+            # Seules les cartes trouvées dans le catalogue restent importables
+            failed.extend((row, str(e)) for row, data in zip(rows, catalog_data) if data is None)
+            batch_data = None
+        params = []
+        for row, scryfall_id, card_data in zip(rows, ids, catalog_data):
+            if card_data is None and batch_data is None:
+                continue
+            try:
+                if card_data is None:
+                    card_data = batch_data.get(scryfall_id) or self.external_provider.get_scryfall_data(scryfall_id)
+                oracle_id, image, types, colors = self._extract_card_fields(card_data)
+                # L'image n'est gardée que si elle correspond à l'impression
+                # possédée (sinon elle est résolue à l'affichage)
+                if card_data.get('id') and card_data['id'] != scryfall_id:
+                    image = ''
+            except ValueError as e:
+                if failed is None:
+                    raise
+                failed.append((row, str(e)))
+                continue
+            params.append((
+                row['Name'].strip(),
+                str(colors),
+                types,
+                scryfall_id,
+                oracle_id,
+                row.get('Set code', '').strip(),
+                row.get('Set name', '').strip(),
+                row.get('Collector number', '').strip(),
+                image,
+                1 if row.get('Foil', '').lower() == 'foil' else 0,
+                row.get('Rarity', '').strip(),
+                int(row.get('Quantity', 1)),
+                row.get('Condition', '').strip(),
+                row.get('Language', 'English').strip(),
+                1 if self._is_commander_eligible(card_data) else 0,
+                colors_to_mask(str(colors)),
+            ))
+        cursor.executemany(_MANABOX_INSERT, params)
+        return cursor.rowcount
+
+    @staticmethod
+    def _file_hash(path: Path) -> str:
+        """Empreinte SHA-256 du contenu d'un fichier."""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _commit_import_chunk(self, conn: sqlite3.Connection, file_hash: str, import_type: str,
+                             row_offset: int, failed: List[Tuple[Dict[str, str], str]]) -> None:
+        """Valide un paquet d'import : file d'attente des échecs, point de reprise, commit."""
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT INTO import_retry_queue (file_hash, row_data, error) VALUES (?, ?, ?)",
+            [(file_hash, json.dumps(row), error) for row, error in failed],
+        )
+        failed.clear()
+        cursor.execute(
+            """
+            INSERT OR REPLACE INTO import_checkpoints (file_hash, import_type, row_offset, updated_at)
+            VALUES (?, ?, ?, ?)
+            """,
+            (file_hash, import_type, row_offset, time.time()),
+        )
+        conn.commit()
+
+    def _load_csv_into_db(self, import_type: str, progress_cb=None, label_cb=None, resumable: bool = False) -> None:
         """Charge les données du CSV dans la base de données SQLite.
-        
+
+        Le fichier est lu en une seule passe ; les lignes sont insérées par
+        paquets (``executemany``) dans une unique transaction, annulée en cas
+        d'erreur.
+
+        En mode reprenable, chaque paquet de ``IMPORT_BATCH_SIZE`` lignes est
+        validé séparément avec un point de reprise (empreinte du fichier,
+        nombre de lignes traitées) : relancer l'import du même fichier reprend
+        après le dernier paquet validé. Les lignes ManaBox dont
+        l'enrichissement Scryfall échoue sont placées dans une file d'attente
+        (voir ``retry_failed_imports``) au lieu d'interrompre l'import.
+
         Args:
             import_type: Type d'import ('ManaBox - Collection' ou 'Moxfield')
-            progress_cb: Fonction de callback pour mettre à jour la barre de progression
+            progress_cb: Fonction de callback pour mettre à jour la barre de
+                progression (pourcentage du fichier lu, de 0 à 100)
             label_cb: Fonction de callback pour mettre à jour le label de progression
+            resumable: Active la validation par paquets et la reprise
         """
+        total_bytes = os.path.getsize(self.csv_path)
+        file_hash = self._file_hash(self.csv_path) if resumable else None
+        failed: List[Tuple[Dict[str, str], str]] = []
         with (
-            open(self.csv_path, 'r', encoding='utf-8') as csvfile,
-            self._get_connection() as conn
+            open(self.csv_path, 'rb') as rawfile,
+            io.TextIOWrapper(rawfile, encoding='utf-8', newline='') as csvfile,
+            self._db.writer() as conn
         ):
             reader = csv.DictReader(csvfile)
             cursor = conn.cursor()
 
-            cursor.execute("SELECT LOWER(name) as name, scryfall_id FROM cards")
+            start_row = 0
+            if resumable:
+                cursor.execute(
+                    "SELECT row_offset FROM import_checkpoints WHERE file_hash = ? AND import_type = ?",
+                    (file_hash, import_type),
+                )
+                checkpoint = cursor.fetchone()
+                if checkpoint:
+                    start_row = checkpoint["row_offset"]
+                    logger.info(f"Reprise de l'import de {self.csv_path} après la ligne {start_row}")
+
+            cursor.execute("SELECT name_norm AS name, scryfall_id FROM cards")
             existing_cards: Set[tuple[str, str]] = {
                 (row["name"], (row["scryfall_id"] or "").strip()) for row in cursor.fetchall()
             }
             inserted_count = 0
-            
-            # Vérifier les colonnes requises
-            total_rows = 0
-            # Compter le nombre de lignes pour le suivi de progression
-            try:
-                total_rows = sum(1 for _ in reader)
-                csvfile.seek(0)
-                reader = csv.DictReader(csvfile)
-            except Exception:
-                total_rows = 0
-
             current_row = 0
 
             if import_type == "ManaBox - Collection":
-                required_columns = {'Name', 'Set code', 'Set name', 'Collector number', 
-                                    'Foil', 'Rarity', 'Quantity', 'Scryfall ID', 'Condition', 'Language'}
+                required_columns = _REQUIRED_COLUMNS[import_type]
                 if not required_columns.issubset(reader.fieldnames or []):
                     raise ValueError(f"Le fichier ManaBox doit contenir les colonnes : {required_columns}")
-                
-                self.external_data_priovider = ExternalDataProvider()
-                
-                # Insérer uniquement les nouvelles données
+                progress = _ImportProgress("Import ManaBox", total_bytes, progress_cb, label_cb)
+
+                # Insérer uniquement les nouvelles données, par paquets
+                # (un appel Scryfall groupé par paquet)
+                pending: List[Dict[str, str]] = []
                 for row in reader:
                     current_row += 1
-                    if label_cb:
-                        label_cb(f"Import ManaBox ({current_row}/{total_rows or '?'})")
+                    progress.update(current_row, rawfile.tell())
+                    if current_row <= start_row:
+                        continue
                     scryfall_id = row.get('Scryfall ID', '').strip()
                     key = (row['Name'].strip().lower(), scryfall_id)
-                    if key in existing_cards:
-                        continue
-                    oracle_id, image, types, colors = self._get_some_data_from_scryfall(scryfall_id)
-                    cursor.execute("""
-                        INSERT OR IGNORE INTO cards 
-                        (name, colors, types, scryfall_id, oracle_id, set_code, set_name, collector_number, image_url,
-                            foil, rarity, quantity, card_condition, language)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        row['Name'].strip(),
-                        str(colors),
-                        types,
-                        scryfall_id,
-                        oracle_id,
-                        row.get('Set code', '').strip(),
-                        row.get('Set name', '').strip(),
-                        row.get('Collector number', '').strip(),
-                        image,
-                        1 if row.get('Foil', '').lower() == 'foil' else 0,
-                        row.get('Rarity', '').strip(),
-                        int(row.get('Quantity', 1)),
-                        row.get('Condition', '').strip(),
-                        row.get('Language', 'English').strip()
-                    ))
-                    inserted_count += cursor.rowcount
-                    existing_cards.add(key)
-                    if progress_cb and total_rows:
-                        progress_cb(current_row)
-                
+                    if key not in existing_cards:
+                        pending.append(row)
+                        existing_cards.add(key)
+                        if len(pending) >= SCRYFALL_COLLECTION_BATCH:
+                            inserted_count += self._insert_manabox_rows(cursor, pending, failed if resumable else None)
+                            pending = []
+                    if resumable and current_row % cts.IMPORT_BATCH_SIZE == 0:
+                        inserted_count += self._insert_manabox_rows(cursor, pending, failed)
+                        pending = []
+                        self._commit_import_chunk(conn, file_hash, import_type, current_row, failed)
+                if pending:
+                    inserted_count += self._insert_manabox_rows(cursor, pending, failed if resumable else None)
+
             elif import_type == "Moxfield":
-                required_columns = {'name', 'scryfall_id', 'colors', 'types', 'quantity'}
+                required_columns = _REQUIRED_COLUMNS[import_type]
                 if not required_columns.issubset(reader.fieldnames or []):
                     raise ValueError(f"Le fichier Moxfield doit contenir les colonnes : {required_columns}")
-                
+                progress = _ImportProgress("Import Moxfield", total_bytes, progress_cb, label_cb)
+
+                params: List[tuple] = []
                 for row in reader:
                     current_row += 1
-                    if label_cb:
-                        label_cb(f"Import Moxfield ({current_row}/{total_rows or '?'})")
+                    progress.update(current_row, rawfile.tell())
+                    if current_row <= start_row:
+                        continue
                     scryfall_id = row.get('scryfall_id', '').strip()
                     key = (row['name'].strip().lower(), scryfall_id)
-                    if key in existing_cards:
-                        continue
-                    cursor.execute("""
-                        INSERT OR IGNORE INTO cards 
-                        (name, scryfall_id, colors, types, quantity)
-                        VALUES (?, ?, ?, ?, ?)
-                    """, (
-                        row['name'].strip(),
-                        scryfall_id,
-                        row.get('colors', '').upper().strip(),
-                        row.get('types', '').strip(),
-                        int(row.get('quantity', 1))
-                    ))
+                    if key not in existing_cards:
+                        colors = row.get('colors', '').upper().strip()
+                        types = row.get('types', '').strip()
+                        params.append((
+                            row['name'].strip(),
+                            scryfall_id,
+                            colors,
+                            types,
+                            int(row.get('quantity', 1)),
+                            colors_to_mask(colors),
+                            1 if self._is_commander_eligible({'type_line': types}) else 0,
+                        ))
+                        existing_cards.add(key)
+                        if len(params) >= cts.IMPORT_BATCH_SIZE:
+                            cursor.executemany(_MOXFIELD_INSERT, params)
+                            inserted_count += cursor.rowcount
+                            params = []
+                    if resumable and current_row % cts.IMPORT_BATCH_SIZE == 0:
+                        if params:
+                            cursor.executemany(_MOXFIELD_INSERT, params)
+                            inserted_count += cursor.rowcount
+                            params = []
+                        self._commit_import_chunk(conn, file_hash, import_type, current_row, failed)
+                if params:
+                    cursor.executemany(_MOXFIELD_INSERT, params)
                     inserted_count += cursor.rowcount
-                    existing_cards.add(key)
-                    if progress_cb and total_rows:
-                        progress_cb(current_row)
             else:
                 raise ValueError(f"Type d'import non supporté : {import_type}")
-            
+
+            if resumable:
+                self._commit_import_chunk(conn, file_hash, import_type, current_row, failed)
+                # Import terminé : un nouvel import du fichier repart du début
+                cursor.execute("DELETE FROM import_checkpoints WHERE file_hash = ?", (file_hash,))
+            progress.update(current_row, total_bytes, force=True)
             conn.commit()
             logger.info(f"Collection chargée depuis {self.csv_path} : {inserted_count} nouvelles cartes")
 
+        if resumable:
+            self.retry_failed_imports()
+
+    def retry_failed_imports(self) -> int:
+        """Retente l'enrichissement et l'insertion des lignes en file d'attente.
+
+        Les lignes insérées quittent la file ; les autres y restent, avec un
+        compteur de tentatives incrémenté.
+
+        Returns:
+            Le nombre de cartes insérées
+        """
+        with self._db.writer() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, row_data FROM import_retry_queue ORDER BY id")
+            entries = cursor.fetchall()
+            inserted_count = 0
+            for start in range(0, len(entries), SCRYFALL_COLLECTION_BATCH):
+                chunk = entries[start:start + SCRYFALL_COLLECTION_BATCH]
+                rows = [json.loads(entry["row_data"]) for entry in chunk]
+                failed: List[Tuple[Dict[str, str], str]] = []
+                inserted_count += self._insert_manabox_rows(cursor, rows, failed)
+                errors = {id(row): error for row, error in failed}
+                for entry, row in zip(chunk, rows):
+                    if id(row) in errors:
+                        cursor.execute(
+                            "UPDATE import_retry_queue SET attempts = attempts + 1, error = ? WHERE id = ?",
+                            (errors[id(row)], entry["id"]),
+                        )
+                    else:
+                        cursor.execute("DELETE FROM import_retry_queue WHERE id = ?", (entry["id"],))
+                conn.commit()
+            cursor.execute("SELECT COUNT(*) AS count FROM import_retry_queue")
+            remaining = cursor.fetchone()["count"]
+        if entries:
+            logger.info(f"File d'attente d'import : {inserted_count} cartes insérées, {remaining} en échec")
+        return inserted_count
+
+    def _read_sync_rows(self, import_type: str, progress: "_ImportProgress",
+                        total_bytes: int) -> Tuple[Dict[str, Tuple[Dict[str, str], str]], str]:
+        """Lit le fichier à synchroniser : ``clé de ligne -> (ligne, empreinte)``.
+
+        Les lignes de même clé (nom, scryfall_id) sont regroupées, leurs
+        quantités additionnées. L'empreinte du fichier est calculée pendant
+        la lecture.
+
+        Returns:
+            Les lignes indexées par clé et l'empreinte SHA-256 du fichier
+        """
+        name_col, id_col, quantity_col = _ROW_KEY_COLUMNS[import_type]
+        rows: Dict[str, Dict[str, str]] = {}
+        digest = hashlib.sha256()
+        with open(self.csv_path, 'rb') as rawfile:
+            def lines():
+                for line in rawfile:
+                    digest.update(line)
+                    yield line.decode('utf-8')
+
+            reader = csv.DictReader(lines())
+            required_columns = _REQUIRED_COLUMNS[import_type]
+            if not required_columns.issubset(reader.fieldnames or []):
+                raise ValueError(f"Le fichier {import_type} doit contenir les colonnes : {required_columns}")
+            for current_row, row in enumerate(reader, start=1):
+                key = f"{row[name_col].strip().lower()}|{row[id_col].strip()}"
+                quantity = int(row.get(quantity_col) or 1)
+                if key in rows:
+                    rows[key][quantity_col] = str(int(rows[key][quantity_col]) + quantity)
+                else:
+                    rows[key] = {column: (value or '').strip() for column, value in row.items() if column}
+                    rows[key][quantity_col] = str(quantity)
+                progress.update(current_row, rawfile.tell())
+        return {
+            key: (row, hashlib.sha1(json.dumps(row, sort_keys=True).encode('utf-8')).hexdigest())
+            for key, row in rows.items()
+        }, digest.hexdigest()
+
+    def sync_from_csv(self, csv_path: str, import_type: str, progress_cb=None, label_cb=None,
+                      source: Optional[str] = None) -> Dict[str, int]:
+        """Synchronise la collection avec un fichier déjà importé.
+
+        L'empreinte du fichier et de chacune de ses lignes est conservée : un
+        fichier inchangé est ignoré, sinon seules les différences avec la
+        synchronisation précédente sont appliquées (cartes ajoutées,
+        quantités modifiées, cartes retirées du fichier), dans une seule
+        transaction. Seules les cartes suivies par cette seule source sont
+        supprimées.
+
+        Un fichier jamais synchronisé est lu une seule fois : ses cartes sont
+        insérées (ou rattachées aux cartes déjà présentes) comme lors d'un
+        premier import.
+
+        Args:
+            csv_path: Chemin vers le fichier CSV de collection.
+            import_type: Type d'import ('ManaBox - Collection' ou 'Moxfield')
+            progress_cb: Callback de progression (pourcentage du fichier lu)
+            label_cb: Callback du label de progression
+            source: Identifiant de la source (par défaut, le chemin absolu du
+                fichier)
+
+        Returns:
+            dict: nombre de lignes ``inserted``, ``updated``, ``unchanged`` et
+            ``failed``, de cartes supprimées ``deleted``, et ``skipped`` (1 si
+            le fichier est inchangé)
+        """
+        if import_type not in _REQUIRED_COLUMNS:
+            raise ValueError(f"Type d'import non supporté : {import_type}")
+        self.csv_path = Path(csv_path)
+        source = source or str(self.csv_path.resolve())
+        counts = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0, "failed": 0, "skipped": 0}
+        total_bytes = os.path.getsize(self.csv_path)
+        progress = _ImportProgress(f"Synchronisation {import_type}", total_bytes, progress_cb, label_cb)
+
+        cursor = self._get_connection().execute(
+            "SELECT file_hash FROM import_sources WHERE source = ? AND import_type = ?", (source, import_type)
+        )
+        known = cursor.fetchone()
+        # Source connue : l'empreinte seule suffit à écarter un fichier inchangé
+        if known and known["file_hash"] == self._file_hash(self.csv_path):
+            progress.update(0, total_bytes, force=True)
+            logger.info(f"{self.csv_path} inchangé depuis la dernière synchronisation")
+            counts["skipped"] = 1
+            return counts
+
+        rows, file_hash = self._read_sync_rows(import_type, progress, total_bytes)
+        name_col, id_col, quantity_col = _ROW_KEY_COLUMNS[import_type]
+
+        with self._db.writer() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT row_key, row_hash, card_id FROM import_rows WHERE source = ?", (source,))
+            previous = {row["row_key"]: (row["row_hash"], row["card_id"]) for row in cursor.fetchall()}
+
+            # Cartes correspondant à des lignes, rapprochées en une requête
+            # (via une table temporaire) : clé de ligne -> id
+            def card_ids(keys: List[str]) -> Dict[str, int]:
+                cursor.execute("""
+                    CREATE TEMP TABLE IF NOT EXISTS sync_keys (
+                        row_key TEXT PRIMARY KEY,
+                        name TEXT,
+                        scryfall_id TEXT
+                    )
+                """)
+                cursor.execute("DELETE FROM temp.sync_keys")
+                cursor.executemany(
+                    "INSERT INTO temp.sync_keys (row_key, name, scryfall_id) VALUES (?, ?, ?)",
+                    [(key, rows[key][0][name_col], rows[key][0][id_col]) for key in keys],
+                )
+                cursor.execute("""
+                    SELECT k.row_key, c.id FROM temp.sync_keys k
+                    JOIN cards c ON c.name = k.name AND c.scryfall_id = k.scryfall_id
+                """)
+                found = {row["row_key"]: row["id"] for row in cursor.fetchall()}
+                cursor.execute("DELETE FROM temp.sync_keys")
+                return found
+
+            # Lignes ajoutées : carte déjà présente (mise à jour) ou nouvelle
+            tracked: Dict[str, int] = {}
+            to_update: List[str] = []
+            added: List[str] = []
+            for key, (row, row_hash) in rows.items():
+                if key not in previous:
+                    added.append(key)
+                elif previous[key][0] == row_hash:
+                    counts["unchanged"] += 1
+                else:
+                    tracked[key] = previous[key][1]
+                    to_update.append(key)
+            existing = card_ids(added) if added else {}
+            to_insert = [key for key in added if key not in existing]
+            tracked.update(existing)
+            to_update += existing
+
+            if import_type == "ManaBox - Collection":
+                failed: List[Tuple[Dict[str, str], str]] = []
+                for start in range(0, len(to_insert), SCRYFALL_COLLECTION_BATCH):
+                    chunk = [rows[key][0] for key in to_insert[start:start + SCRYFALL_COLLECTION_BATCH]]
+                    self._insert_manabox_rows(cursor, chunk, failed)
+                counts["failed"] = len(failed)
+                update_params = [
+                    (int(row['Quantity']), 1 if row.get('Foil', '').lower() == 'foil' else 0,
+                     row.get('Rarity', ''), row.get('Condition', ''), row.get('Language', 'English'))
+                    for row in (rows[key][0] for key in to_update)
+                ]
+            else:
+                cursor.executemany(_MOXFIELD_INSERT, [
+                    (row['name'], row['scryfall_id'], row.get('colors', '').upper(), row.get('types', ''),
+                     int(row['quantity']), colors_to_mask(row.get('colors', '')),
+                     1 if self._is_commander_eligible({'type_line': row.get('types', '')}) else 0)
+                    for row in (rows[key][0] for key in to_insert)
+                ])
+                update_params = [
+                    (int(row['quantity']), row.get('colors', '').upper(), row.get('types', ''))
+                    for row in (rows[key][0] for key in to_update)
+                ]
+
+            inserted = card_ids(to_insert) if to_insert else {}
+            tracked.update(inserted)
+            counts["inserted"] = len(inserted)
+
+            cursor.executemany(
+                _SYNC_UPDATES[import_type],
+                [params + (tracked[key],) for key, params in zip(to_update, update_params)],
+            )
+            # Lignes rattachées ou modifiées dont les valeurs n'ont pas changé
+            counts["updated"] = max(cursor.rowcount, 0) if to_update else 0
+            counts["unchanged"] += len(to_update) - counts["updated"]
+
+            # Lignes retirées du fichier : leurs cartes sont supprimées, sauf si
+            # une autre source les suit encore
+            removed = [key for key in previous if key not in rows]
+            cursor.executemany(
+                "DELETE FROM import_rows WHERE source = ? AND row_key = ?", [(source, key) for key in removed]
+            )
+            cursor.executemany(
+                """
+                DELETE FROM cards WHERE id = ?1
+                AND NOT EXISTS (SELECT 1 FROM import_rows WHERE card_id = ?1)
+                """,
+                [(previous[key][1],) for key in removed],
+            )
+            counts["deleted"] = max(cursor.rowcount, 0) if removed else 0
+
+            cursor.executemany(
+                "INSERT OR REPLACE INTO import_rows (source, row_key, row_hash, card_id) VALUES (?, ?, ?, ?)",
+                [(source, key, rows[key][1], card_id) for key, card_id in tracked.items()],
+            )
+            # Une ligne sans carte suivie (échec d'enrichissement...) : le
+            # fichier sera de nouveau comparé à la prochaine synchronisation
+            all_tracked = all(key in tracked or key in previous for key in rows)
+            cursor.execute(
+                """
+                INSERT OR REPLACE INTO import_sources (source, import_type, file_hash, synced_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (source, import_type, file_hash if all_tracked else None, time.time()),
+            )
+
+        progress.update(len(rows), total_bytes, force=True)
+        logger.info(
+            f"Synchronisation de {self.csv_path} : {counts['inserted']} ajoutées, {counts['updated']} modifiées, "
+            f"{counts['deleted']} supprimées, {counts['unchanged']} inchangées"
+        )
+        return counts
+
+    def is_synced_source(self, csv_path: str, source: Optional[str] = None) -> bool:
+        """Indique si un fichier a déjà été synchronisé (voir ``sync_from_csv``)."""
+        source = source or str(Path(csv_path).resolve())
+        cursor = self._get_connection().execute("SELECT 1 FROM import_sources WHERE source = ?", (source,))
+        return cursor.fetchone() is not None
+
     def get_all_cards(self) -> List[Dict[str, Any]]:
         """Récupère toutes les cartes de la collection.
         
@@ -259,8 +1038,8 @@ class CollectionManager:
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "SELECT * FROM cards WHERE LOWER(name) = LOWER(?)",
-                (name.strip(),)
+                "SELECT * FROM cards WHERE name_norm = LOWER(TRIM(?))",
+                (name,)
             )
             result = cursor.fetchone()
             return dict(result) if result else None
@@ -301,15 +1080,22 @@ class CollectionManager:
             result = cursor.fetchone()
             return dict(result) if result else None
 
-    def search_cards(self, query: str) -> List[Dict[str, Any]]:
+    def search_cards(self, query: str, full_text: bool = False, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Recherche des cartes par nom (recherche partielle insensible à la casse).
         
         Args:
             query: Le terme de recherche
+            full_text: Utilise l'index plein texte : chaque mot de ``query``
+                est cherché comme préfixe dans le nom, les types, l'édition et
+                le numéro de collection, et les résultats sont classés par
+                pertinence.
+            limit: Nombre maximal de résultats (mode plein texte)
             
         Returns:
             Une liste de dictionnaires représentant les cartes correspondantes
         """
+        if full_text:
+            return self._search_cards_fts(query, limit)
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
@@ -318,35 +1104,147 @@ class CollectionManager:
             )
             return [dict(row) for row in cursor.fetchall()]
 
+    def _search_cards_fts(self, query: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Recherche plein texte (FTS5) par préfixes, classée par pertinence."""
+        match = _fts_match(query)
+        if match is None:
+            cards = self.get_all_cards()
+            return cards[:limit] if limit is not None else cards
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT c.* FROM cards_fts
+                JOIN cards c ON c.id = cards_fts.rowid
+                WHERE cards_fts MATCH ?
+                ORDER BY {_FTS_RANKING}, c.name
+                LIMIT ?
+                """,
+                (match, -1 if limit is None else limit),
+            )
+            return [dict(row) for row in cursor.fetchall()]
+
+    def query_cards(
+        self,
+        color_mask: Optional[int] = None,
+        card_type: Optional[str] = None,
+        text: Optional[str] = None,
+        after: Optional[PageCursor] = None,
+        limit: int = cts.COLLECTION_PAGE_SIZE,
+        count: bool = True,
+    ) -> CardPage:
+        """Lit une page de la collection filtrée (pagination par clé).
+
+        Les cartes sont triées par ``(name_norm, id)`` : la page suivante
+        reprend après le curseur de la précédente via l'index sur le nom,
+        sans ``OFFSET``, quelle que soit sa position dans la collection.
+
+        Args:
+            color_mask: Ne garde que les cartes ayant toutes les couleurs du
+                masque (voir ``mtg.colors``)
+            card_type: Texte recherché dans la ligne de types (sans casse)
+            text: Recherche plein texte par préfixes (nom, types, édition...)
+            after: Curseur ``next_cursor`` de la page précédente
+            limit: Nombre maximal de cartes dans la page
+            count: Calcule ``total`` et ``total_quantity`` (inutile pour les
+                pages suivantes d'une même requête)
+
+        Returns:
+            CardPage: les cartes de la page et le curseur de la suivante
+        """
+        conditions: List[str] = []
+        params: List[Any] = []
+        if color_mask:
+            conditions.append("(color_mask & ?) = ?")
+            params += [color_mask, color_mask]
+        if card_type:
+            conditions.append("instr(LOWER(COALESCE(types, '')), LOWER(?)) > 0")
+            params.append(card_type)
+        match = _fts_match(text or "")
+        if match is not None:
+            conditions.append("id IN (SELECT rowid FROM cards_fts WHERE cards_fts MATCH ?)")
+            params.append(match)
+        where = " AND ".join(conditions) or "1"
+
+        total = total_quantity = None
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            if count:
+                cursor.execute(
+                    f"SELECT COUNT(*), COALESCE(SUM(quantity), 0) FROM cards WHERE {where}",
+                    params,
+                )
+                total, total_quantity = cursor.fetchone()
+
+            page_where, page_params = where, list(params)
+            if after is not None:
+                page_where += " AND (name_norm, id) > (?, ?)"
+                page_params += list(after)
+            # Une ligne de plus que demandé indique s'il reste une page
+            cursor.execute(
+                f"SELECT * FROM cards WHERE {page_where} ORDER BY name_norm, id LIMIT ?",
+                page_params + [limit + 1],
+            )
+            cards = [dict(row) for row in cursor.fetchall()]
+
+        next_cursor = None
+        if len(cards) > limit:
+            cards = cards[:limit]
+            next_cursor = (cards[-1]["name_norm"], cards[-1]["id"]) if cards else None
+        return CardPage(cards, next_cursor, total, total_quantity)
+
+    def get_collection_filter_values(self) -> Tuple[List[str], List[str]]:
+        """Couleurs et types principaux présents dans la collection.
+
+        Returns:
+            Tuple[List[str], List[str]]: couleurs et types triés, pour
+            alimenter les filtres de l'interface
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT DISTINCT color_mask FROM cards")
+            masks = [row[0] for row in cursor.fetchall()]
+            cursor.execute("SELECT DISTINCT types FROM cards WHERE types IS NOT NULL AND types != ''")
+            types_rows = [row[0] for row in cursor.fetchall()]
+
+        colors = {color for mask in masks for color in mask_to_colors(mask)}
+        types = {types.split(" — ")[0].strip() for types in types_rows}
+        types.discard("")
+        return sorted(colors), sorted(types)
+
     def get_commander_candidates(self, get_all: bool = False) -> List[Dict[str, Any]]:
         """Récupère les cartes pouvant être des commandants.
-        
+
+        Les cartes sont dédoublonnées par nom normalisé (une ligne par nom),
+        via l'index sur ``is_commander_eligible``.
+
+        Args:
+            get_all: Si True, retourne les lignes complètes ; sinon les noms
+
         Returns:
-            Une liste de dictionnaires représentant les cartes légendaires de type créature
+            Une liste de dictionnaires (ou de noms) des cartes pouvant être
+            commandant, triée par nom
         """
         with self._get_connection() as conn:
             cursor = conn.cursor()
+            if get_all:
+                cursor.execute("""
+                    SELECT * FROM cards
+                    WHERE id IN (
+                        SELECT MIN(id) FROM cards
+                        WHERE is_commander_eligible = 1
+                        GROUP BY name_norm
+                    )
+                    ORDER BY name
+                """)
+                return [dict(row) for row in cursor.fetchall()]
             cursor.execute("""
-                SELECT * FROM cards 
-                WHERE LOWER(types) LIKE '%legendary%' 
-                  AND LOWER(types) LIKE '%creature%'
+                SELECT MIN(name) AS name FROM cards
+                WHERE is_commander_eligible = 1
+                GROUP BY name_norm
                 ORDER BY name
             """)
-            rows = cursor.fetchall()
-            seen = set()
-            unique_rows = []
-            for row in rows:
-                name = row['name']
-                key = name.lower().strip()
-                if key in seen:
-                    continue
-                seen.add(key)
-                unique_rows.append(dict(row))
-
-            if get_all:
-                return unique_rows
-            else:
-                return [row['name'] for row in unique_rows]
+            return [row['name'] for row in cursor.fetchall()]
 
     def get_card_quantity(self, name: str) -> int:
         """Récupère la quantité d'une carte dans la collection.
@@ -357,44 +1255,129 @@ class CollectionManager:
         Returns:
             La quantité disponible (0 si la carte n'existe pas)
         """
-        card = self.find_card_by_name(name)
-        return card['quantity'] if card else 0
+        ownership = self.get_card_ownership(name)
+        return ownership['quantity'] if ownership else 0
+
+    def get_card_ownership(self, name: str) -> Optional[Dict[str, Any]]:
+        """Récupère la possession agrégée d'une carte (toutes impressions confondues).
+
+        Args:
+            name: Le nom de la carte (insensible à la casse)
+
+        Returns:
+            La ligne de ``card_ownership`` (quantité totale, nombre
+            d'impressions, impression de référence...), ou None
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT * FROM card_ownership WHERE name_norm = LOWER(TRIM(?))
+                ORDER BY quantity DESC, owner_key LIMIT 1
+                """,
+                (name,),
+            )
+            result = cursor.fetchone()
+            return dict(result) if result else None
     
-    def get_card_colors(self, name: str) -> Set[str]:
-        """Récupère l'identité couleur d'une carte.
-        
+    def get_card_color_mask(self, name: str) -> int:
+        """Récupère l'identité couleur d'une carte sous forme de masque.
+
         Args:
             name: Le nom de la carte
-            
+
         Returns:
-            Un ensemble de lettres représentant les couleurs de la carte.
-            
+            Le masque de couleurs de la carte (voir ``mtg.colors``).
+
         Comportement particulier pour les commandants non présents dans la collection :
             - Si la carte n'est pas trouvée en base locale, on interroge Scryfall
-              via ``ExternalDataProvider`` pour récupérer son identité couleur.
+              via le fournisseur partagé pour récupérer son identité couleur.
             - En cas d'échec (erreur réseau, carte introuvable, etc.), on
-              retourne un ensemble vide, ce qui laisse le deckbuilder gérer
-              la situation (identité couleur considérée comme inconnue).
+              retourne 0, ce qui laisse le deckbuilder gérer la situation
+              (identité couleur considérée comme inconnue).
         """
-        card = self.find_card_by_name(name)
-        if card is not None:
-            import ast
-            colors = ast.literal_eval(card.get("colors", []))
-            return set(colors)
+        ownership = self.get_card_ownership(name)
+        if ownership is not None:
+            return ownership["color_mask"]
 
         # Pas dans la collection locale : tentative via Scryfall
         try:
-            provider = ExternalDataProvider()
-            data = provider.get_scryfall_data(name)
+            data = self.external_provider.get_scryfall_data(name)
         except Exception:
             # En cas de problème d'accès à Scryfall, on considère la carte
             # comme incolore / identité inconnue pour ne pas bloquer.
-            return set()
+            return 0
 
         # On récupère l'identité couleur (color_identity est la bonne notion
         # pour Commander), en tombant éventuellement sur une carte incolore.
-        colors = data.get("color_identity") or []
-        return set(colors)
+        return colors_to_mask(data.get("color_identity") or [])
+
+    def get_card_color_masks(self, names: List[str]) -> Dict[str, int]:
+        """Récupère l'identité couleur de plusieurs cartes (voir ``get_card_color_mask``).
+
+        Les noms sont rapprochés de ``card_ownership`` en une seule requête
+        (via une table temporaire) ; les cartes absentes de la collection sont
+        résolues par paquets via ``get_scryfall_data_batch``. Une carte
+        introuvable, ou un échec d'accès à Scryfall, donne un masque nul.
+
+        Args:
+            names: Noms des cartes
+
+        Returns:
+            dict: ``nom -> masque de couleurs``, pour chaque nom fourni
+        """
+        names = list(dict.fromkeys(name for name in names if name))
+        masks: Dict[str, int] = {}
+        if not names:
+            return masks
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS color_names (
+                    name TEXT PRIMARY KEY,
+                    name_norm TEXT
+                )
+            """)
+            cursor.execute("DELETE FROM temp.color_names")
+            cursor.executemany(
+                "INSERT INTO temp.color_names (name, name_norm) VALUES (?, LOWER(TRIM(?)))",
+                [(name, name) for name in names],
+            )
+            # Même choix que ``get_card_ownership`` : la carte la plus possédée
+            cursor.execute("""
+                SELECT n.name, o.color_mask
+                FROM temp.color_names n
+                JOIN card_ownership o ON o.name_norm = n.name_norm
+                ORDER BY o.quantity DESC, o.owner_key
+            """)
+            for name, mask in cursor.fetchall():
+                masks.setdefault(name, mask)
+            cursor.execute("DELETE FROM temp.color_names")
+
+        missing = [name for name in names if name not in masks]
+        if missing:
+            try:
+                found = self.external_provider.get_scryfall_data_batch(missing)
+            except Exception:
+                found = {}
+            for name in missing:
+                data = found.get(name) or {}
+                masks[name] = colors_to_mask(data.get("color_identity") or [])
+        return masks
+
+    def get_card_colors(self, name: str) -> Set[str]:
+        """Récupère l'identité couleur d'une carte.
+        
+        Args:
+            name: Le nom de la carte
+            
+        Returns:
+            Un ensemble de lettres représentant les couleurs de la carte
+            (``{"colorless"}`` pour une carte explicitement incolore, vide si
+            l'identité est inconnue ; voir ``get_card_color_mask``).
+        """
+        return set(mask_to_colors(self.get_card_color_mask(name)))
 
     def has_card(self, name: str) -> bool:
         """Vérifie si une carte est présente dans la collection.
@@ -407,57 +1390,58 @@ class CollectionManager:
         """
         return self.get_card_quantity(name) > 0
 
-    def export_db_to_csv(self, path: str) -> None:
+    def export_db_to_csv(self, path: str, compress: Optional[bool] = None) -> None:
         """Exporte la base de données vers un fichier CSV.
-        
+
+        Les cartes sont lues par paquets (``cts.EXPORT_FETCH_SIZE``) et écrites
+        au fil de l'eau : la mémoire utilisée ne dépend pas de la taille de la
+        collection.
+
         Args:
             path: Chemin du fichier de sortie
-            
+            compress: Compresse le fichier en gzip (par défaut si ``path``
+                se termine par ``.gz``)
+
         Raises:
             IOError: En cas d'erreur d'écriture
         """
+        columns = ", ".join(_EXPORT_CSV_FIELDS)
         try:
-            cards = self.get_all_cards()
-            if not cards:
-                logger.warning("Aucune carte à exporter")
-                return
-                
-            with open(path, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['name', 'colors', 'types', 'quantity', 'scryfall_id', 'set_code', 'set_name', 'collector_number', 'foil', 'rarity', 'card_condition', 'language']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                writer.writeheader()
-                for card in cards:
-                    writer.writerow({
-                        'name': card['name'],
-                        'colors': card.get('colors', ''),
-                        'types': card.get('types', ''),
-                        'quantity': card['quantity'],
-                        'scryfall_id': card.get('scryfall_id', ''),
-                        'set_code': card.get('set_code', ''),
-                        'set_name': card.get('set_name', ''),
-                        'collector_number': card.get('collector_number', ''),
-                        'foil': card.get('foil', 0),
-                        'rarity': card.get('rarity', ''),
-                        'card_condition': card.get('card_condition', ''),
-                        'language': card.get('language', '')
-                    })
-                    
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f"SELECT {columns} FROM cards ORDER BY name, id")
+                rows = _iter_rows(cursor)
+                first = next(rows, None)
+                if first is None:
+                    logger.warning("Aucune carte à exporter")
+                    return
+
+                with _open_export(path, compress, newline='') as csvfile:
+                    writer = csv.writer(csvfile)
+                    writer.writerow(_EXPORT_CSV_FIELDS)
+                    writer.writerows(tuple(row) for row in itertools.chain([first], rows))
+
             logger.info(f"Collection exportée avec succès vers {path}")
-            
+
         except Exception as e:
             logger.error(f"Erreur lors de l'export CSV : {str(e)}")
             raise
 
-    def export_db_list_cards_to_txt(self, scryfall_id_list: list[str], path: str) -> None:
+    def export_db_list_cards_to_txt(
+        self, scryfall_id_list: list[str], path: str, compress: Optional[bool] = None
+    ) -> None:
         """Exporte une liste de cartes vers un fichier texte.
 
         Chaque carte correspondant aux ``scryfall_id`` fournis est écrite sur une
-        ligne, au format lisible par un joueur (par exemple ``3x Sol Ring [C15-235]``).
+        ligne, au format lisible par un joueur (par exemple ``1x Sol Ring (C15) 235``).
+        Les identifiants passent par une table temporaire plutôt que par des
+        paramètres ``IN (?, ...)`` : la liste n'est pas limitée par SQLite.
 
         Args:
             scryfall_id_list: Liste d'identifiants Scryfall (oracle_id ou id de carte).
             path: Chemin du fichier texte de sortie.
+            compress: Compresse le fichier en gzip (par défaut si ``path``
+                se termine par ``.gz``).
 
         Raises:
             IOError: En cas d'erreur d'écriture du fichier.
@@ -466,34 +1450,40 @@ class CollectionManager:
             logger.warning("Liste de scryfall_id vide, rien à exporter")
             return
 
-        # Récupération des cartes concernées depuis la base
-        placeholders = ",".join(["?"] * len(scryfall_id_list))
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                f"SELECT * FROM cards WHERE cards.scryfall_id IN ({placeholders}) ORDER BY cards.name",
-                scryfall_id_list,
-            )
-            cards = [dict(row) for row in cursor.fetchall()]
-
-        if not cards:
-            logger.warning("Aucune carte trouvée pour les scryfall_id fournis")
-            return
-
         try:
-            with open(path, "w", encoding="utf-8") as txtfile:
-                for card in cards:
-                    qty = card.get("quantity", 1)
-                    name = card.get("name", "?")
-                    set_code = card.get("set_code", "")
-                    collector = card.get("collector_number", "")
-
-                    # Format type : "3x Sol Ring (C15) 235"
-                    if set_code and collector:
-                        line = f"{1}x {name} ({set_code}) {collector}\n"
-                    else:
-                        line = f"{1}x {name}\n"
-                    txtfile.write(line)
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "CREATE TEMP TABLE IF NOT EXISTS export_ids (scryfall_id TEXT PRIMARY KEY)"
+                )
+                cursor.execute("DELETE FROM temp.export_ids")
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO temp.export_ids (scryfall_id) VALUES (?)",
+                    ((scryfall_id,) for scryfall_id in scryfall_id_list),
+                )
+                try:
+                    cursor.execute("""
+                        SELECT c.name, c.set_code, c.collector_number
+                        FROM cards c
+                        WHERE c.scryfall_id IN (SELECT scryfall_id FROM temp.export_ids)
+                        ORDER BY c.name, c.id
+                    """)
+                    rows = _iter_rows(cursor)
+                    first = next(rows, None)
+                    if first is None:
+                        logger.warning("Aucune carte trouvée pour les scryfall_id fournis")
+                        return
+
+                    with _open_export(path, compress) as txtfile:
+                        for name, set_code, collector in itertools.chain([first], rows):
+                            # Format type : "1x Sol Ring (C15) 235"
+                            if set_code and collector:
+                                line = f"{1}x {name} ({set_code}) {collector}\n"
+                            else:
+                                line = f"{1}x {name}\n"
+                            txtfile.write(line)
+                finally:
+                    cursor.execute("DELETE FROM temp.export_ids")
 
             logger.info(f"Liste de cartes exportée avec succès vers {path}")
         except Exception as e:
@@ -502,22 +1492,32 @@ class CollectionManager:
 
     def clear_all_cards(self) -> None:
         """Supprime toutes les cartes de la collection."""
-        with self._get_connection() as conn:
+        with self._db.writer() as conn:
             cursor = conn.cursor()
+            cursor.execute("DELETE FROM import_rows")
+            cursor.execute("DELETE FROM import_sources")
             cursor.execute("DELETE FROM cards")
-            conn.commit()
+            cursor.execute("DELETE FROM import_checkpoints")
+            cursor.execute("DELETE FROM import_retry_queue")
+
+    def close(self) -> None:
+        """Ferme les connexions à la base de données de tous les threads."""
+        self._db.close_all()
 
     def __del__(self):
-        """Ferme la connexion à la base de données lors de la destruction de l'instance."""
-        if hasattr(self, 'conn'):
-            self.conn.close()
+        """Ferme les connexions à la base de données lors de la destruction de l'instance."""
+        if hasattr(self, '_db'):
+            self._db.close_all()
 
     # Méthodes de compatibilité avec l'ancienne interface
-    def load_from_csv(self, csv_path: str, import_type: str, progress_cb=None, label_cb=None) -> bool:
+    def load_from_csv(self, csv_path: str, import_type: str, progress_cb=None, label_cb=None,
+                      resumable: bool = False) -> bool:
         """Charge la collection depuis un fichier CSV (compatibilité).
         
         Args:
             csv_path: Chemin vers le fichier CSV de collection.
+            resumable: Import validé par paquets et reprenable (voir
+                ``_load_csv_into_db``).
             
         Returns:
             bool: True si le chargement a réussi, False sinon.
@@ -525,7 +1525,7 @@ class CollectionManager:
         # try:
         cts.CSV_PATH = csv_path
         self.csv_path = Path(csv_path)
-        self._load_csv_into_db(import_type, progress_cb, label_cb)
+        self._load_csv_into_db(import_type, progress_cb, label_cb, resumable)
         return True
         # except Exception as e:
         #     logger.error(f"Erreur lors du chargement du CSV : {str(e)}")
@@ -547,56 +1547,75 @@ class CollectionManager:
         """
         Compare un deck Archidekt à la collection locale.
 
+        Les cartes du deck sont chargées dans une table temporaire puis
+        rapprochées de la possession agrégée (``card_ownership``) en une seule
+        requête, par oracle_id sinon par nom normalisé : la quantité possédée
+        cumule toutes les impressions. Les cartes absentes de la collection
+        sont omises.
+
         Args:
             deck_data: JSON complet retourné par l'API Archidekt.
-            collection: Instance de CollectionManager.
 
         Returns:
             Liste de dicts : chaque entrée décrit la disponibilité d'une carte.
         """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS deck_cards (
+                    pos INTEGER PRIMARY KEY,
+                    name_norm TEXT,
+                    oracle_id TEXT
+                )
+            """)
+            cursor.execute("DELETE FROM temp.deck_cards")
+            cursor.executemany(
+                "INSERT INTO temp.deck_cards (pos, name_norm, oracle_id) VALUES (?, LOWER(TRIM(?)), ?)",
+                [(pos, name, info["oracle_id"] or None) for pos, (name, info) in enumerate(deck_data.items())],
+            )
+            # Une ligne de possession par carte du deck : par oracle_id, sinon
+            # par nom normalisé (recherches indexées)
+            cursor.execute("""
+                SELECT d.pos, o.colors, o.color_mask, o.types, o.scryfall_id, o.image_url, o.quantity
+                FROM temp.deck_cards d
+                JOIN card_ownership o ON o.owner_key = COALESCE(
+                    (SELECT owner_key FROM card_ownership WHERE owner_key = d.oracle_id),
+                    (SELECT owner_key FROM card_ownership WHERE name_norm = d.name_norm
+                     ORDER BY quantity DESC, owner_key LIMIT 1)
+                )
+                ORDER BY d.pos
+            """)
+            matches = cursor.fetchall()
+            cursor.execute("DELETE FROM temp.deck_cards")
+
+        deck_items = list(deck_data.items())
         results = []
-        oracle_in_db = True
-        for name, info in deck_data.items():
-            oracle_id = info["oracle_id"]
+        for card_local in matches:
+            name, info = deck_items[card_local["pos"]]
             quantity_needed = info["quantity"]
+            owned_quantity = card_local["quantity"]
+            types = card_local["types"]
+            defaultCategory = info["defaultCategory"]
+            if defaultCategory is None:
+                if 'Land' in types:
+                    defaultCategory = "Land"
+                else:
+                    defaultCategory = "Other"
 
-            owned_quantity = 0
-            card_local = None
+            results.append({
+                "name": name,
+                "colors": card_local["colors"],
+                "color_mask": card_local["color_mask"],
+                "types": card_local["types"],
+                "scryfall_id": card_local["scryfall_id"],
+                "image_url": card_local["image_url"],
+                "edhrec_rank": info["edhrec_rank"],
+                "occurence": info["occurence"],
+                "defaultCategory": defaultCategory,
+                "needed": quantity_needed,
+                "owned": owned_quantity,
+                "missing": max(0, quantity_needed - owned_quantity)
 
-            # 1. Essai par scryfall_id
-            if oracle_id and oracle_in_db:
-                try:
-                    card_local = self.find_card_by_oracleID(oracle_id)
-                except sqlite3.OperationalError:
-                    oracle_in_db = False
-
-            # 2. Sinon essai par nom
-            if card_local is None:
-                card_local = self.find_card_by_name(name)
-
-            if card_local:
-                owned_quantity = card_local["quantity"]
-                types = card_local["types"]
-                defaultCategory = info["defaultCategory"]
-                if defaultCategory is None:
-                    if 'Land' in types:
-                        defaultCategory = "Land"
-                    else:
-                        defaultCategory = "Other"
-
-                results.append({
-                    "name": name,
-                    "colors": card_local["colors"],
-                    "types": card_local["types"],
-                    "scryfall_id": card_local["scryfall_id"],
-                    "image_url": card_local["image_url"],
-                    "edhrec_rank": info["edhrec_rank"],
-                    "occurence": info["occurence"],
-                    "defaultCategory": defaultCategory,
-                    "needed": quantity_needed,
-                    "owned": owned_quantity,
-                    "missing": max(0, quantity_needed - owned_quantity)
-
-                })
+            })
 
         return results
@@ -0,0 +1,66 @@
+"""Identité couleur sous forme de masque de bits.
+
+Chaque couleur occupe un bit (W=1, U=2, B=4, R=8, G=16) ; le bit
+``COLORLESS`` (32) marque une carte explicitement incolore. Une carte est
+jouable avec un commandant si ``mask & ~commander_mask & ALL_COLORS == 0``.
+"""
+
+from typing import Iterable, List, Optional, Union
+
+# Ordre canonique des couleurs (WUBRG)
+COLOR_ORDER = "WUBRG"
+COLOR_BITS = {color: 1 << idx for idx, color in enumerate(COLOR_ORDER)}
+ALL_COLORS = sum(COLOR_BITS.values())
+COLORLESS = 1 << len(COLOR_ORDER)
+
+
+def colors_to_mask(colors: Union[str, Iterable[str], None]) -> int:
+    """Convertit une identité couleur en masque.
+
+    Args:
+        colors: Liste de symboles (``["W", "U"]``), ou texte stocké par les
+            anciennes versions (``"['W', 'U']"``, ``"WU"``, ``"['colorless']"``).
+
+    Returns:
+        int: le masque correspondant (0 si inconnu)
+    """
+    if colors is None:
+        return 0
+    text = colors if isinstance(colors, str) else ",".join(str(c) for c in colors)
+    # Même règle que ``color_mask_sql`` : « colorless » est retiré avant de
+    # chercher les symboles (il contient un R)
+    text = text.upper()
+    mask = COLORLESS if "COLORLESS" in text else 0
+    text = text.replace("COLORLESS", "")
+    for color, bit in COLOR_BITS.items():
+        if color in text:
+            mask |= bit
+    return mask
+
+
+def mask_to_colors(mask: Optional[int]) -> List[str]:
+    """Symboles d'un masque dans l'ordre WUBRG (``["colorless"]`` si incolore)."""
+    mask = mask or 0
+    colors = [color for color, bit in COLOR_BITS.items() if mask & bit]
+    if not colors and mask & COLORLESS:
+        return ["colorless"]
+    return colors
+
+
+def format_colors(mask: Optional[int]) -> str:
+    """Texte affichable d'un masque (``"W, U"``, ``"colorless"`` ou ``""``)."""
+    return ", ".join(mask_to_colors(mask))
+
+
+def is_within_identity(mask: Optional[int], commander_mask: Optional[int]) -> bool:
+    """Indique si une carte respecte l'identité couleur d'un commandant."""
+    return (mask or 0) & ~(commander_mask or 0) & ALL_COLORS == 0
+
+
+def color_mask_sql(column: str) -> str:
+    """Expression SQL calculant le masque d'une colonne texte (voir ``colors_to_mask``)."""
+    text = f"UPPER(COALESCE({column}, ''))"
+    stripped = f"REPLACE({text}, 'COLORLESS', '')"
+    terms = [f"(instr({stripped}, '{color}') > 0) * {bit}" for color, bit in COLOR_BITS.items()]
+    terms.append(f"(instr({text}, 'COLORLESS') > 0) * {COLORLESS}")
+    return "(" + " + ".join(terms) + ")"
@@ -0,0 +1,109 @@
+"""Outils de concurrence partagés (limitation de débit, etc.)."""
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """Limiteur de débit à seau de jetons, partagé entre threads.
+
+    Le seau se remplit de ``rate`` jetons par seconde jusqu'à ``capacity``.
+    Chaque requête consomme un jeton ; en l'absence de jeton disponible,
+    l'appelant est mis en attente le temps nécessaire.
+
+    Attributes:
+        rate: Nombre de requêtes autorisées par seconde
+        capacity: Nombre maximal de requêtes pouvant partir en rafale
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError("Le débit doit être strictement positif")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity is not None else 1.0
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated_at
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Tente de consommer des jetons sans attendre.
+
+        Returns:
+            0 si les jetons ont été consommés, sinon le délai (secondes) à
+            attendre avant qu'ils soient disponibles.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Consomme des jetons, en attendant si nécessaire."""
+        while True:
+            delay = self.try_acquire(tokens)
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+
+class SingleFlight:
+    """Regroupe les appels concurrents portant sur la même clé.
+
+    Le premier appelant d'une clé exécute la fonction ; les appelants
+    arrivant pendant son exécution attendent et reçoivent le même résultat
+    (ou la même exception) au lieu de relancer l'appel.
+
+    Attributes:
+        calls: Nombre total d'appels à ``do``
+        executions: Nombre d'exécutions effectives de la fonction
+        coalesced: Nombre d'appels servis par une exécution déjà en cours
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        """Exécute ``func()`` pour ``key``, ou attend l'exécution en cours."""
+        with self._lock:
+            self.calls += 1
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Compteurs d'appels (total, exécutés, regroupés)."""
+        with self._lock:
+            return {"calls": self.calls, "executions": self.executions, "coalesced": self.coalesced}
@@ -2,6 +2,45 @@ VERSION = "1.4.0"
 CSV_PATH = None
 DB_PATH = "data/collection.db"
 SCRYFALL_BULK = "data/oracle-cards.json"
+CATALOG_DB_PATH = "data/card_catalog.db"
+HTTP_CACHE_PATH = "data/http_cache.db"
+DECK_STORE_PATH = "data/decks.db"
+
+# Cache mémoire des cartes Scryfall (projection des champs utiles)
+SCRYFALL_CACHE_MAX_ENTRIES = 20000
+SCRYFALL_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+# URLs de base des API externes
+ARCHIDEKT_API = "https://archidekt.com/api"
+SCRYFALL_API = "https://api.scryfall.com"
+
+# Débits autorisés par les API externes et parallélisme des téléchargements
+ARCHIDEKT_REQUESTS_PER_SECOND = 10
+SCRYFALL_REQUESTS_PER_SECOND = 10
+ARCHIDEKT_MAX_WORKERS = 8
+
+# Nombre de decks Archidekt échantillonnés (Faible, Moyen, Élevé)
+ARCHIDEKT_SAMPLE_SIZES = (20, 60, 200)
+
+# Transport HTTP : timeouts (connexion, lecture) et nombre de reprises
+HTTP_TIMEOUT = (5, 30)
+HTTP_MAX_RETRIES = 4
+
+# Import CSV : taille des paquets d'insertion et intervalle minimal (secondes)
+# entre deux notifications de progression
+IMPORT_BATCH_SIZE = 1000
+IMPORT_PROGRESS_INTERVAL = 0.1
+
+# Nombre de cartes chargées par page dans l'onglet collection
+COLLECTION_PAGE_SIZE = 200
+
+# Export : nombre de lignes lues par appel à ``fetchmany``
+EXPORT_FETCH_SIZE = 1000
+
+# Réglages SQLite de la base de collection
+SQLITE_CACHE_SIZE_KIB = 20000
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+SQLITE_BUSY_TIMEOUT_MS = 5000
 
 EVENTUAL_SCRYFALL_ID_LIST = []
-DECK_BUILD_SCRYFALL_ID_LIST = []
\ No newline at end of file
+DECK_BUILD_SCRYFALL_ID_LIST = []
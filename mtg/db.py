@@ -0,0 +1,104 @@
+"""Connexions SQLite partagées entre threads (WAL, un seul écrivain)."""
+
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+from mtg import constants as cts
+
+logger = logging.getLogger(__name__)
+
+# Réglages appliqués à chaque connexion
+DEFAULT_PRAGMAS: Dict[str, Union[int, str]] = {
+    # Les lecteurs ne sont pas bloqués par une écriture en cours
+    "journal_mode": "WAL",
+    # Sûr en mode WAL (seul le dernier commit peut être perdu en cas de coupure)
+    "synchronous": "NORMAL",
+    # Valeur négative : taille en Kio
+    "cache_size": -cts.SQLITE_CACHE_SIZE_KIB,
+    "mmap_size": cts.SQLITE_MMAP_SIZE,
+    "temp_store": "MEMORY",
+    "busy_timeout": cts.SQLITE_BUSY_TIMEOUT_MS,
+}
+
+
+class ConnectionManager:
+    """Fournit une connexion SQLite par thread et sérialise les écritures.
+
+    Chaque thread obtient sa propre connexion, ce qui permet de lire depuis
+    le thread de l'interface pendant qu'un import écrit dans un autre
+    thread. Les écritures passent par ``writer()``, qui garantit un seul
+    écrivain à la fois dans le processus.
+
+    Attributes:
+        db_path: Chemin de la base SQLite
+        pragmas: PRAGMA appliqués à chaque nouvelle connexion
+    """
+
+    def __init__(self, db_path: Union[str, Path], pragmas: Optional[Dict[str, Union[int, str]]] = None) -> None:
+        self.db_path = Path(db_path)
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Une connexion n'est utilisée que par son thread ; check_same_thread
+        # est désactivé pour permettre à ``close_all`` de les fermer.
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """Retourne la connexion du thread courant (créée à la demande)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Ouvre une écriture exclusive sur la connexion du thread courant.
+
+        La transaction est validée à la sortie du bloc, ou annulée en cas
+        d'exception. Le verrou est réentrant : un bloc ``writer()`` peut en
+        contenir un autre (la validation a lieu à la sortie de chacun).
+        """
+        with self._write_lock:
+            conn = self.connection()
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+
+    def close(self) -> None:
+        """Ferme la connexion du thread courant."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            with self._lock:
+                if conn in self._connections:
+                    self._connections.remove(conn)
+            conn.close()
+
+    def close_all(self) -> None:
+        """Ferme les connexions de tous les threads."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Fermeture de connexion impossible : {e}")
+        self._local = threading.local()
@@ -0,0 +1,83 @@
+"""Stockage local des decks Archidekt déjà téléchargés."""
+
+import json
+import sqlite3
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Dict, Optional
+
+from mtg import constants as cts
+
+logger = logging.getLogger(__name__)
+
+
+class DeckStore:
+    """Conserve la liste de cartes de chaque deck Archidekt.
+
+    Chaque deck est indexé par son id et associé à sa date de dernière mise
+    à jour (``updatedAt`` d'Archidekt) : un deck n'est retéléchargé que
+    s'il est nouveau ou a été modifié depuis.
+
+    Attributes:
+        db_path: Chemin de la base SQLite
+    """
+
+    def __init__(self, db_path: Optional[str] = None) -> None:
+        self.db_path = Path(db_path or cts.DECK_STORE_PATH)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Retourne la connexion au stockage (créée à la demande)."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS archidekt_decks (
+                    deck_id TEXT PRIMARY KEY,
+                    updated_at TEXT NOT NULL,
+                    cards TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+            """)
+        return self._conn
+
+    def get(self, deck_id: str, updated_at: str) -> Optional[Dict[str, Dict]]:
+        """Retourne les cartes d'un deck si la version stockée est à jour.
+
+        Args:
+            deck_id: Id Archidekt du deck
+            updated_at: Date de mise à jour annoncée par le listing Archidekt
+
+        Returns:
+            Les cartes du deck, ou None si le deck est absent ou obsolète
+        """
+        with self._lock:
+            row = self._get_connection().execute(
+                "SELECT cards FROM archidekt_decks WHERE deck_id = ? AND updated_at = ?",
+                (str(deck_id), updated_at),
+            ).fetchone()
+        return json.loads(row["cards"]) if row else None
+
+    def put(self, deck_id: str, updated_at: str, cards: Dict[str, Dict]) -> None:
+        """Enregistre (ou remplace) la version courante d'un deck."""
+        with self._lock:
+            conn = self._get_connection()
+            with conn:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO archidekt_decks (deck_id, updated_at, cards, fetched_at)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (str(deck_id), updated_at, json.dumps(cards, separators=(",", ":")), time.time()),
+                )
+
+    def close(self) -> None:
+        """Ferme la connexion au stockage."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -3,6 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Set, Iterable, Any
 from mtg import constants as cts
+from mtg.colors import is_within_identity
+from mtg.external_data import ExternalDataProvider, get_external_provider
 
 # Rôles principaux gérés par le système de scoring
 ROLE_RAMP = "Ramp"
@@ -69,21 +71,44 @@ class DeckBuilder:
     module à l'interface graphique ou à d'autres composants.
     """
 
-    def __init__(self, app, commander_name:str, eventual_deck_data: List[Dict[str, Any]]) -> None:
+    def __init__(self, app, commander_name:str, eventual_deck_data: List[Dict[str, Any]],
+                 external_provider: Optional[ExternalDataProvider] = None) -> None:
         self.app = app
+        self.external_provider = external_provider if external_provider is not None else get_external_provider()
         self.commander_name = commander_name
-        self.commander_colors = self._get_card_colors(commander_name)
+        self.commander_color_mask = self._get_card_color_mask(commander_name)
         self.deck_data = eventual_deck_data
         self.scored_cards = self.score_cards()
 
-    def _get_card_colors(self, name: str) -> Set[str]:
-        """Retourne l'identité couleur connue d'une carte.
+    def _get_card_color_mask(self, name: str) -> int:
+        """Retourne l'identité couleur connue d'une carte (masque, voir ``mtg.colors``).
 
         Si aucune information n'est disponible, considère la carte comme
-        incolore (ensemble vide), ce qui la rend toujours jouable vis-à-vis
+        incolore (masque nul), ce qui la rend toujours jouable vis-à-vis
         de l'identité couleur du commandant.
         """
-        return self.app.collection_manager.get_card_colors(name)
+        return self.app.collection_manager.get_card_color_mask(name)
+
+    def _get_card_color_masks(self, entries: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Retourne l'identité couleur de toutes les cartes candidates.
+
+        Les entrées issues de la comparaison avec la collection portent déjà
+        leur ``color_mask`` ; les autres sont résolues en un seul appel à
+        ``CollectionManager.get_card_color_masks``.
+        """
+        masks: Dict[str, int] = {}
+        unknown: List[str] = []
+        for entry in entries:
+            name = entry.get("name")
+            if not name:
+                continue
+            if entry.get("color_mask") is not None:
+                masks[name] = entry["color_mask"]
+            else:
+                unknown.append(name)
+        if unknown:
+            masks.update(self.app.collection_manager.get_card_color_masks(unknown))
+        return masks
 
 
     def _get_role_weight(self, role: str) -> float:
@@ -126,7 +151,9 @@ class DeckBuilder:
                 max_rank = rank
 
         scored: List[Dict[str, Any]] = []
-        commander_colors = set(self.commander_colors)
+        commander_mask = self.commander_color_mask
+        # Identités couleur résolues en une fois pour toutes les candidates
+        color_masks = self._get_card_color_masks(self.deck_data)
         for entry in self.deck_data:
             name = entry.get("name")
             if not name:
@@ -134,8 +161,7 @@ class DeckBuilder:
             # Filtre identité couleur : la carte doit être un sous-ensemble
             # des couleurs du commandant. Les cartes sans info sont considérées
             # comme incolores et donc toujours jouables.
-            card_colors = self._get_card_colors(name)
-            if card_colors and not card_colors.issubset(commander_colors):
+            if not is_within_identity(color_masks.get(name, 0), commander_mask):
                 continue
             try:
                 occ = int(entry.get("occurence", 0) or 0)
@@ -382,7 +408,7 @@ class DeckBuilder:
         )
         if not commander_already_in_deck:
             try:
-                data = self.app.external_provider.get_scryfall_data(self.commander_name)
+                data = self.external_provider.get_scryfall_data(self.commander_name)
                 types = data.get("type_line", "")
                 scryfall_id = data.get("id")
 
@@ -1,70 +1,334 @@
 """Gestion des données externes (Archidekt, Scryfall, etc.)."""
 
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Iterable, Iterator, Optional, Set, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
-import time
+import threading
 import requests
 from pathlib import Path
 import logging
 
+from mtg import constants as cts
+from mtg.card_cache import CardCache
+from mtg.card_catalog import CardCatalog
+from mtg.concurrency import SingleFlight, TokenBucket
+from mtg.deck_store import DeckStore
+from mtg.http_cache import HttpCache
+from mtg.http_client import HttpClient, get_http_client
+from mtg.utils import is_uuid_like, normalize_card_name
+
 logger = logging.getLogger(__name__)
 
+# Nombre maximal d'identifiants acceptés par l'endpoint /cards/collection
+SCRYFALL_COLLECTION_BATCH = 75
+
+# Limiteurs de débit par source, partagés par tous les threads et instances
+RATE_LIMITERS: Dict[str, TokenBucket] = {
+    "archidekt": TokenBucket(cts.ARCHIDEKT_REQUESTS_PER_SECOND),
+    "scryfall": TokenBucket(cts.SCRYFALL_REQUESTS_PER_SECOND),
+}
+
+
+class ArchidektDeckMerger:
+    """Agrège les cartes de plusieurs decks Archidekt.
+
+    Le résultat ne dépend pas de l'ordre dans lequel les decks sont ajoutés :
+    les occurrences sont cumulées et, pour chaque carte, les informations
+    conservées sont celles du deck de plus petit rang, comme lors d'un
+    chargement séquentiel.
+    """
+
+    def __init__(self) -> None:
+        self._cards: Dict[str, Dict] = {}
+        self._first_seen: Dict[str, Tuple[int, int]] = {}
+
+    def add(self, deck_index: int, deck: Dict[str, Dict]) -> None:
+        """Ajoute un deck.
+
+        Args:
+            deck_index: Rang du deck dans la liste Archidekt
+            deck: Cartes du deck (format ``load_archidekt_deck``)
+        """
+        for position, (name, info) in enumerate(deck.items()):
+            rank = (deck_index, position)
+            current = self._cards.get(name)
+            if current is None:
+                self._cards[name] = dict(info)
+                self._first_seen[name] = rank
+                continue
+            # on cumule les occurences (nb de decks où la carte apparaît)
+            occurence = current["occurence"] + info.get("occurence", 1)
+            if rank < self._first_seen[name]:
+                current = dict(info)
+                self._first_seen[name] = rank
+            current["occurence"] = occurence
+            self._cards[name] = current
+
+    @property
+    def cards(self) -> Dict[str, Dict]:
+        """Cartes agrégées, dans l'ordre d'un chargement séquentiel."""
+        return {name: self._cards[name] for name in sorted(self._cards, key=self._first_seen.__getitem__)}
+
+
+class ArchidektDeckListing:
+    """Listing paginé des decks Archidekt d'un commandant.
+
+    Les pages sont parcourues à la demande ; la page suivante est préchargée
+    en arrière-plan pendant que l'appelant traite la page courante. Le
+    parcours s'arrête dès que ``target`` decks ont été produits.
+
+    Attributes:
+        target: Nombre de decks souhaité (None : tout le listing)
+        total: Nombre total de decks annoncé par Archidekt (connu après la
+            première page)
+    """
+
+    def __init__(self, provider: "ExternalDataProvider", commander_name: str, order_by: str,
+                 target: Optional[int] = None) -> None:
+        self.provider = provider
+        self.commander_name = commander_name
+        self.order_by = order_by
+        self.target = target
+        self.total: Optional[int] = None
+
+    def _fetch(self, page: int) -> Dict:
+        return self.provider._get_archidekt_listing_page(self.commander_name, self.order_by, page)
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        if self.target is not None and self.target <= 0:
+            return
+        prefetch = ThreadPoolExecutor(max_workers=1)
+        seen: Set[str] = set()
+        page = 1
+        future = prefetch.submit(self._fetch, page)
+        try:
+            while future is not None:
+                data = future.result()
+                if self.total is None:
+                    self.total = data.get("count")
+                results = data.get("results") or []
+                future = None
+                remaining = None if self.target is None else self.target - len(seen)
+                if results and data.get("next") and (remaining is None or len(results) < remaining):
+                    page += 1
+                    future = prefetch.submit(self._fetch, page)
+                for result in results:
+                    deck_id = str(result["id"])
+                    # Un deck peut glisser d'une page à l'autre entre deux requêtes
+                    if deck_id in seen:
+                        continue
+                    seen.add(deck_id)
+                    yield {"id": deck_id, "updated_at": result.get("updatedAt") or ""}
+                    if self.target is not None and len(seen) >= self.target:
+                        return
+        finally:
+            prefetch.shutdown(wait=False, cancel_futures=True)
+
+
 class ExternalDataProvider:
     """Gère la récupération des données externes."""
 
-    def __init__(self) -> None:
-        self._scryfall_cache: dict[str, dict] = {}
+    def __init__(self, catalog: Optional[CardCatalog] = None, http_cache: Optional[HttpCache] = None,
+                 http_client: Optional[HttpClient] = None, archidekt_api: str = cts.ARCHIDEKT_API,
+                 scryfall_api: str = cts.SCRYFALL_API, deck_store: Optional[DeckStore] = None) -> None:
+        """Initialise le fournisseur.
 
-    def get_archidekt_decks_id_for_commander(self, commander_name: str, order_by: str) -> list[str]:
-        """Récupère les ids des decks archideckt en fonction d'un commandant spécifique.
+        Args:
+            catalog: Catalogue local des cartes, consulté avant l'API Scryfall.
+                Par défaut, le catalogue construit depuis ``SCRYFALL_BULK``.
+            http_cache: Cache persistant des réponses HTTP. Par défaut, le
+                cache situé à ``HTTP_CACHE_PATH``.
+            http_client: Transport HTTP. Par défaut, le client partagé par
+                toute l'application.
+            archidekt_api: URL de base de l'API Archidekt
+            scryfall_api: URL de base de l'API Scryfall
+            deck_store: Stockage local des decks Archidekt. Par défaut, celui
+                situé à ``DECK_STORE_PATH``.
+        """
+        self._scryfall_cache = CardCache()
+        # Regroupe les recherches simultanées d'une même carte
+        self._scryfall_flight = SingleFlight()
+        self.catalog = catalog if catalog is not None else CardCatalog()
+        self.http_cache = http_cache if http_cache is not None else HttpCache()
+        self.http_client = http_client if http_client is not None else get_http_client()
+        self.archidekt_api = archidekt_api.rstrip("/")
+        self.scryfall_api = scryfall_api.rstrip("/")
+        self.deck_store = deck_store if deck_store is not None else DeckStore()
+
+    def _get_json(self, url: str, source: str, params: Optional[Dict] = None, use_cache: bool = True):
+        """Effectue un GET JSON en passant par le cache HTTP persistant.
+
+        Une entrée fraîche est servie sans appel réseau ; une entrée expirée
+        est revalidée via ``If-None-Match`` / ``If-Modified-Since``.
 
         Args:
-            commander_name (str): nom du commandant à filtrer
+            url: URL de l'endpoint
+            source: Source de la requête ("scryfall" ou "archidekt"), qui
+                détermine la durée de validité du cache
+            params: Paramètres de la requête
+            use_cache: Si False, la requête part toujours sur le réseau et la
+                réponse n'est pas mise en cache.
 
         Returns:
-            list[str]: liste des ids de deck
+            Le JSON décodé de la réponse.
         """
-        if order_by == "Vues":
-            order_by = "-viewCount"
-        else:
-            order_by = "-updatedAt"
-        base = "https://archidekt.com/api/decks/v3/"
+        if not use_cache:
+            RATE_LIMITERS[source].acquire()
+            response = self.http_client.get(url, params=params)
+            response.raise_for_status()
+            return response.json()
+
+        key = HttpCache.make_key(url, params)
+        entry = self.http_cache.get(key)
+        if entry is not None and entry.is_fresh(self.http_cache.ttl_for(source)):
+            return json.loads(entry.body)
+
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        RATE_LIMITERS[source].acquire()
+        response = self.http_client.get(url, params=params, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            self.http_cache.mark_validated(key)
+            return json.loads(entry.body)
+        response.raise_for_status()
+        data = response.json()
+        self.http_cache.put(
+            key,
+            source,
+            response.text,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+        )
+        return data
+
+    def _scryfall_request(self, identifier: str) -> Tuple[str, Optional[Dict]]:
+        """Retourne (url, params) de la requête Scryfall pour une carte."""
+        if is_uuid_like(identifier):
+            return f"{self.scryfall_api}/cards/{identifier}", None
+        # Recherche par nom exact
+        return f"{self.scryfall_api}/cards/named", {"exact": identifier}
+
+    def _get_archidekt_listing_page(self, commander_name: str, order_by: str, page: int) -> Dict:
+        """Récupère une page du listing Archidekt des decks d'un commandant.
+
+        Le listing n'est pas mis en cache : son ``updatedAt`` est le seul
+        signal qui invalide les decks du stockage local.
+        """
+        base = f"{self.archidekt_api}/decks/v3/"
         params = {
             "commanderName": commander_name,
             "deckFormat": "3",
             "orderBy": order_by,
-            "page": 1
+            "page": page
         }
-        r = requests.get(base, params=params)
-        r.raise_for_status()
-        results = r.json().get("results", [])
-        decks_id = []
-        if results:
-            for result in results:
-                decks_id.append(str(result["id"]))
-        return decks_id
+        return self._get_json(base, "archidekt", params, use_cache=False)
+
+    def get_archidekt_deck_listing(self, commander_name: str, order_by: str,
+                                   target: Optional[int] = None) -> "ArchidektDeckListing":
+        """Parcourt, page par page, les decks Archidekt d'un commandant.
+
+        Args:
+            commander_name: nom du commandant à filtrer
+            order_by: critère de tri ("Vues" ou "Mise à jour")
+            target: nombre de decks souhaité (None : tout le listing)
+
+        Returns:
+            ArchidektDeckListing: itérable de ``{"id": str, "updated_at": str}``
+        """
+        if order_by == "Vues":
+            order_by = "-viewCount"
+        else:
+            order_by = "-updatedAt"
+        return ArchidektDeckListing(self, commander_name, order_by, target)
+
+    def get_archidekt_decks_id_for_commander(self, commander_name: str, order_by: str,
+                                             target: Optional[int] = None) -> Iterator[str]:
+        """Récupère les ids des decks archideckt en fonction d'un commandant spécifique.
+
+        Les ids sont produits au fil des pages du listing, jusqu'à ``target``.
+
+        Args:
+            commander_name (str): nom du commandant à filtrer
+            order_by (str): critère de tri ("Vues" ou "Mise à jour")
+            target (int): nombre maximal d'ids (None : tout le listing)
+
+        Yields:
+            str: id de deck
+        """
+        for deck in self.get_archidekt_deck_listing(commander_name, order_by, target):
+            yield deck["id"]
     
-    def load_archidekt_deck(self, id: str) -> Dict:
+    def load_archidekt_deck(self, id: str, updated_at: Optional[str] = None) -> Dict:
         """Charge un deck exporté depuis Archidekt.
         
         Args:
-            file_path: Chemin vers le fichier JSON d'Archidekt.
+            id: Id Archidekt du deck.
+            updated_at: Date de mise à jour annoncée par le listing. Si elle
+                est fournie, le deck est servi par le stockage local tant
+                qu'il n'a pas été modifié, et n'est retéléchargé que sinon.
             
         Returns:
             dict: Structure du deck chargé.
         """
-        base = f"https://archidekt.com/api/decks/{id}/cards/"
-        r = requests.get(base)
-        r.raise_for_status()
-        results = r.json()
+        if updated_at:
+            cards = self.deck_store.get(id, updated_at)
+            if cards is not None:
+                return cards
+        base = f"{self.archidekt_api}/decks/{id}/cards/"
+        # Le stockage local suffit à suivre les versions d'un deck daté
+        results = self._get_json(base, "archidekt", use_cache=not updated_at)
         cards= {}
         if results:
             for result in results:
                 info = result["card"]
                 card = info["oracleCard"]
                 cards[card["name"]] = {"oracle_id": card["uid"], "quantity": result["quantity"], "edhrec_rank": card["edhrecRank"], "defaultCategory": card["defaultCategory"], "occurence": 1}
+        if updated_at:
+            self.deck_store.put(id, updated_at, cards)
         return cards
 
+    def iter_archidekt_decks(self, decks: Iterable[Union[str, Dict[str, str]]],
+                             max_workers: int = cts.ARCHIDEKT_MAX_WORKERS,
+                             updated_at: Optional[Dict[str, str]] = None) -> Iterator[Tuple[int, Dict]]:
+        """Télécharge plusieurs decks Archidekt en parallèle.
+
+        Le débit global reste borné par le limiteur ``archidekt`` partagé
+        entre tous les threads. ``decks`` peut être un listing paginé : les
+        téléchargements démarrent dès que les premiers ids sont connus.
+
+        Args:
+            decks: Ids des decks à charger, ou entrées de listing
+                ``{"id", "updated_at"}``
+            max_workers: Nombre maximal de téléchargements simultanés
+            updated_at: Dates de mise à jour par id de deck (listing
+                Archidekt), pour ne retélécharger que les decks modifiés
+
+        Yields:
+            Tuple[int, dict]: (rang du deck dans ``decks``, cartes du deck),
+            au fur et à mesure des téléchargements.
+        """
+        updated_at = updated_at or {}
+        pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+        pending: Dict = {}
+        try:
+            for idx, deck in enumerate(decks):
+                if isinstance(deck, dict):
+                    deck_id, deck_updated_at = deck["id"], deck.get("updated_at")
+                else:
+                    deck_id, deck_updated_at = deck, updated_at.get(deck)
+                pending[pool.submit(self.load_archidekt_deck, deck_id, deck_updated_at)] = idx
+                for future in [f for f in pending if f.done()]:
+                    yield pending.pop(future), future.result()
+            for future in as_completed(list(pending)):
+                yield pending.pop(future), future.result()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
     def get_scryfall_data(self, identifier: str):
         """Récupère les informations d'une carte depuis l'API Scryfall.
 
@@ -72,37 +336,31 @@ class ExternalDataProvider:
             identifier: Soit un ``scryfall_id`` (UUID), soit un nom exact de
                 carte. Si l'identifiant ressemble à un UUID, on utilise
                 ``/cards/{id}``, sinon l'endpoint ``/cards/named`` avec
-                ``?exact=``.
+                ``?exact=``. Les appels simultanés sur un même identifiant
+                partagent une seule recherche (et son éventuelle erreur).
 
         Returns:
-            dict: les informations complètes de la carte telles que renvoyées
-            par Scryfall.
+            dict: la projection des informations Scryfall de la carte
+            (voir ``project_card``).
         """
         cache_key = identifier
-        if cache_key in self._scryfall_cache:
-            return self._scryfall_cache[cache_key]
-
-        try:
-            # Déterminer si l'identifiant ressemble à un UUID Scryfall
-            is_uuid_like = len(identifier) in (32, 36) and all(c in "0123456789abcdef-" for c in identifier.lower())
-
-            time.sleep(0.075)
-            if is_uuid_like:
-                url = f"https://api.scryfall.com/cards/{identifier}"
-            else:
-                # Recherche par nom exact
-                url = "https://api.scryfall.com/cards/named"
-                params = {"exact": identifier}
+        card_data = self._scryfall_cache.get(cache_key)
+        if card_data is not None:
+            return card_data
+        return self._scryfall_flight.do(cache_key, lambda: self._fetch_scryfall_data(identifier))
 
-            if is_uuid_like:
-                response = requests.get(url)
-            else:
-                response = requests.get(url, params=params)
+    def _fetch_scryfall_data(self, identifier: str) -> Dict:
+        """Résout une carte absente du cache mémoire (catalogue, puis réseau)."""
+        cache_key = identifier
+        # Catalogue local (bulk Scryfall) avant tout appel réseau
+        card_data = self.catalog.lookup(identifier) if self.catalog else None
+        if card_data:
+            return self._scryfall_cache.put(cache_key, card_data)
 
-            response.raise_for_status()  # Lève une exception pour les codes d'erreur HTTP
-            card_data = response.json()
-            self._scryfall_cache[cache_key] = card_data
-            return card_data
+        try:
+            url, params = self._scryfall_request(identifier)
+            card_data = self._get_json(url, "scryfall", params)
+            return self._scryfall_cache.put(cache_key, card_data)
 
         except requests.exceptions.RequestException as e:
             logger.error(f"Erreur lors de l'appel à l'API Scryfall : {str(e)}")
@@ -111,6 +369,86 @@ class ExternalDataProvider:
             logger.error(f"Format de réponse inattendu de l'API Scryfall : {str(e)}")
             raise ValueError("Format de réponse inattendu de l'API Scryfall")
 
+    def get_scryfall_data_batch(self, identifiers: List[str]) -> Dict[str, Dict]:
+        """Récupère les informations de plusieurs cartes en un minimum d'appels.
+
+        Les identifiants absents du cache et du catalogue local sont résolus
+        par paquets de ``SCRYFALL_COLLECTION_BATCH`` via l'endpoint
+        ``/cards/collection`` (une requête par paquet).
+
+        Args:
+            identifiers: Liste de ``scryfall_id`` (UUID) ou de noms exacts.
+
+        Returns:
+            dict: ``identifiant -> projection Scryfall``. Les cartes
+            introuvables sont absentes du dictionnaire.
+        """
+        results: Dict[str, Dict] = {}
+        missing: List[str] = []
+        for identifier in dict.fromkeys(i for i in identifiers if i):
+            card_data = self._scryfall_cache.get(identifier)
+            if card_data is not None:
+                results[identifier] = card_data
+                continue
+            card_data = self.catalog.lookup(identifier) if self.catalog else None
+            if not card_data:
+                entry = self.http_cache.get_fresh(HttpCache.make_key(*self._scryfall_request(identifier)))
+                card_data = json.loads(entry.body) if entry else None
+            if card_data:
+                results[identifier] = self._scryfall_cache.put(identifier, card_data)
+            else:
+                missing.append(identifier)
+
+        for start in range(0, len(missing), SCRYFALL_COLLECTION_BATCH):
+            chunk = missing[start:start + SCRYFALL_COLLECTION_BATCH]
+            # Correspondance clé normalisée -> identifiant demandé
+            wanted: Dict[str, str] = {}
+            payload = []
+            for identifier in chunk:
+                if is_uuid_like(identifier):
+                    wanted[identifier.lower()] = identifier
+                    payload.append({"id": identifier})
+                else:
+                    wanted[normalize_card_name(identifier)] = identifier
+                    payload.append({"name": identifier})
+            try:
+                RATE_LIMITERS["scryfall"].acquire()
+                response = self.http_client.post(
+                    f"{self.scryfall_api}/cards/collection",
+                    json={"identifiers": payload},
+                )
+                response.raise_for_status()
+                cards = response.json().get("data", [])
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Erreur lors de l'appel à l'API Scryfall : {str(e)}")
+                raise ValueError(f"Impossible de récupérer les informations des cartes : {str(e)}")
+
+            for card_data in cards:
+                keys = [str(card_data.get("id", "")).lower(), normalize_card_name(card_data.get("name", ""))]
+                keys += [normalize_card_name(face.get("name", "")) for face in card_data.get("card_faces") or []]
+                for key in keys:
+                    identifier = wanted.get(key)
+                    if identifier and identifier not in results:
+                        projected = self._scryfall_cache.put(identifier, card_data)
+                        results[identifier] = projected
+                        # Stocké sous la clé de la requête unitaire équivalente
+                        self.http_cache.put(
+                            HttpCache.make_key(*self._scryfall_request(identifier)),
+                            "scryfall",
+                            json.dumps(projected, separators=(",", ":")),
+                        )
+        return results
+
+    def get_scryfall_cache_stats(self) -> Dict[str, int]:
+        """Retourne les compteurs du cache mémoire des cartes (hits, misses, ...).
+
+        ``coalesced`` compte les recherches épargnées par le regroupement des
+        appels simultanés sur une même carte.
+        """
+        stats = self._scryfall_cache.stats()
+        stats["coalesced"] = self._scryfall_flight.stats()["coalesced"]
+        return stats
+
     def get_image_url_from_scryfall(self, scryfall_id: str) -> Optional[str]:
         """Retourne l'URL d'image (format normal) pour une carte donnée."""
         data = self.get_scryfall_data(scryfall_id)
@@ -144,3 +482,25 @@ class ExternalDataProvider:
             return None
 
 
+_shared_provider: Optional[ExternalDataProvider] = None
+_shared_lock = threading.Lock()
+
+
+def get_external_provider() -> ExternalDataProvider:
+    """Retourne le fournisseur partagé par tout le processus.
+
+    Collection, deckbuilder et interface utilisent ainsi le même cache de
+    cartes et le même pool de connexions.
+    """
+    global _shared_provider
+    with _shared_lock:
+        if _shared_provider is None:
+            _shared_provider = ExternalDataProvider()
+        return _shared_provider
+
+
+def set_external_provider(provider: Optional[ExternalDataProvider]) -> None:
+    """Remplace le fournisseur partagé (None : recréé à la prochaine demande)."""
+    global _shared_provider
+    with _shared_lock:
+        _shared_provider = provider
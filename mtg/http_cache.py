@@ -0,0 +1,205 @@
+"""Cache HTTP persistant (SQLite) pour les réponses Scryfall et Archidekt."""
+
+import sqlite3
+import threading
+import time
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+from mtg import constants as cts
+
+logger = logging.getLogger(__name__)
+
+# Durée de validité par source (secondes)
+DEFAULT_TTLS: Dict[str, int] = {
+    "scryfall": 7 * 24 * 3600,
+    "archidekt": 24 * 3600,
+}
+DEFAULT_TTL = 3600
+
+# Taille maximale du cache sur disque (octets)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Délai (secondes) en deçà duquel une lecture ne met pas à jour ``accessed_at``
+# (la précision LRU suffit et une lecture n'entraîne pas d'écriture)
+ACCESS_TOUCH_INTERVAL = 3600
+
+
+@dataclass
+class CacheEntry:
+    """Réponse HTTP mise en cache.
+
+    Attributes:
+        body: Corps de la réponse (texte JSON)
+        source: Source de la réponse ("scryfall", "archidekt", ...)
+        etag: En-tête ``ETag`` renvoyé par le serveur
+        last_modified: En-tête ``Last-Modified`` renvoyé par le serveur
+        stored_at: Date (epoch) de la dernière validation auprès du serveur
+    """
+
+    body: str
+    source: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+    def is_fresh(self, ttl: float) -> bool:
+        """Indique si l'entrée peut être servie sans revalidation."""
+        return (time.time() - self.stored_at) < ttl
+
+
+class HttpCache:
+    """Cache de réponses HTTP partagé entre instances et redémarrages.
+
+    Les entrées sont indexées par endpoint et paramètres, expirent selon une
+    durée propre à chaque source, conservent ``ETag``/``Last-Modified`` pour
+    la revalidation et sont évincées selon la politique LRU au-delà de
+    ``max_bytes``.
+
+    Attributes:
+        db_path: Chemin de la base SQLite du cache
+        ttls: Durée de validité (secondes) par source
+        max_bytes: Taille maximale cumulée des réponses stockées
+    """
+
+    def __init__(self, db_path: Optional[str] = None, ttls: Optional[Dict[str, int]] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.db_path = Path(db_path or cts.HTTP_CACHE_PATH)
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.max_bytes = max_bytes
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict] = None) -> str:
+        """Construit la clé de cache d'une requête (endpoint + paramètres triés)."""
+        if not params:
+            return url
+        return f"{url}?{urlencode(sorted(params.items()))}"
+
+    def ttl_for(self, source: str) -> float:
+        """Retourne la durée de validité associée à une source."""
+        return self.ttls.get(source, DEFAULT_TTL)
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Retourne la connexion au cache (créée à la demande)."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS http_cache (
+                    key TEXT PRIMARY KEY,
+                    source TEXT NOT NULL,
+                    body TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    stored_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    size INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_http_cache_accessed ON http_cache(accessed_at);
+                -- Taille cumulée des réponses, tenue à jour à chaque écriture
+                CREATE TABLE IF NOT EXISTS http_cache_meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+                INSERT OR IGNORE INTO http_cache_meta (key, value)
+                VALUES ('total_bytes', (SELECT COALESCE(SUM(size), 0) FROM http_cache));
+            """)
+        return self._conn
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Retourne l'entrée associée à ``key`` (fraîche ou non), ou None."""
+        with self._lock:
+            conn = self._get_connection()
+            row = conn.execute(
+                "SELECT body, source, etag, last_modified, stored_at, accessed_at FROM http_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if now - row["accessed_at"] >= ACCESS_TOUCH_INTERVAL:
+                with conn:
+                    conn.execute("UPDATE http_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return CacheEntry(row["body"], row["source"], row["etag"], row["last_modified"], row["stored_at"])
+
+    def get_fresh(self, key: str) -> Optional[CacheEntry]:
+        """Retourne l'entrée associée à ``key`` uniquement si elle n'a pas expiré."""
+        entry = self.get(key)
+        if entry is not None and entry.is_fresh(self.ttl_for(entry.source)):
+            return entry
+        return None
+
+    def put(self, key: str, source: str, body: str, etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> None:
+        """Enregistre une réponse puis applique la limite de taille."""
+        now = time.time()
+        size = len(body.encode("utf-8"))
+        with self._lock:
+            conn = self._get_connection()
+            with conn:
+                previous = conn.execute("SELECT size FROM http_cache WHERE key = ?", (key,)).fetchone()
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO http_cache
+                    (key, source, body, etag, last_modified, stored_at, accessed_at, size)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (key, source, body, etag, last_modified, now, now, size),
+                )
+                self._add_total(conn, size - (previous["size"] if previous else 0))
+                self._evict(conn)
+
+    def mark_validated(self, key: str) -> None:
+        """Prolonge une entrée revalidée par le serveur (réponse 304)."""
+        now = time.time()
+        with self._lock:
+            conn = self._get_connection()
+            with conn:
+                conn.execute(
+                    "UPDATE http_cache SET stored_at = ?, accessed_at = ? WHERE key = ?",
+                    (now, now, key),
+                )
+
+    @staticmethod
+    def _add_total(conn: sqlite3.Connection, delta: int) -> None:
+        """Met à jour la taille cumulée des réponses stockées."""
+        if delta:
+            conn.execute("UPDATE http_cache_meta SET value = value + ? WHERE key = 'total_bytes'", (delta,))
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Supprime les entrées les moins récemment utilisées au-delà de ``max_bytes``."""
+        total = conn.execute("SELECT value FROM http_cache_meta WHERE key = 'total_bytes'").fetchone()["value"]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for row in conn.execute("SELECT key, size FROM http_cache ORDER BY accessed_at"):
+            if freed >= excess:
+                break
+            victims.append((row["key"],))
+            freed += row["size"]
+        conn.executemany("DELETE FROM http_cache WHERE key = ?", victims)
+        self._add_total(conn, -freed)
+        logger.debug(f"Cache HTTP : {len(victims)} entrées évincées ({freed} octets)")
+
+    def clear(self) -> None:
+        """Vide le cache."""
+        with self._lock:
+            conn = self._get_connection()
+            with conn:
+                conn.execute("DELETE FROM http_cache")
+                conn.execute("UPDATE http_cache_meta SET value = 0 WHERE key = 'total_bytes'")
+
+    def close(self) -> None:
+        """Ferme la connexion au cache."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
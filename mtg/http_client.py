@@ -0,0 +1,180 @@
+"""Couche de transport HTTP partagée (sessions, timeouts, reprises)."""
+
+import random
+import threading
+import time
+import logging
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+from mtg import constants as cts
+
+logger = logging.getLogger(__name__)
+
+# Codes HTTP donnant lieu à une nouvelle tentative
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class TransportStats:
+    """Compteurs de trafic par hôte.
+
+    Attributes:
+        requests_by_host: Nombre de requêtes envoyées (tentatives incluses)
+        bytes_by_host: Nombre d'octets de corps de réponse reçus
+        retries_by_host: Nombre de nouvelles tentatives effectuées
+    """
+
+    requests_by_host: Dict[str, int] = field(default_factory=dict)
+    bytes_by_host: Dict[str, int] = field(default_factory=dict)
+    retries_by_host: Dict[str, int] = field(default_factory=dict)
+    # Les compteurs sont mis à jour depuis les threads de téléchargement
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, host: str, response: requests.Response) -> None:
+        """Comptabilise une réponse reçue de ``host``."""
+        size = len(response.content or b"")
+        with self._lock:
+            self.requests_by_host[host] = self.requests_by_host.get(host, 0) + 1
+            self.bytes_by_host[host] = self.bytes_by_host.get(host, 0) + size
+
+    def record_retry(self, host: str) -> None:
+        """Comptabilise une nouvelle tentative vers ``host``."""
+        with self._lock:
+            self.retries_by_host[host] = self.retries_by_host.get(host, 0) + 1
+
+
+class HttpClient:
+    """Client HTTP avec pool de connexions keep-alive par hôte.
+
+    Une session ``requests`` est conservée par hôte, ce qui réutilise les
+    connexions TCP/TLS entre les appels. Les erreurs 429 et 5xx sont
+    retentées avec un délai exponentiel qui respecte ``Retry-After``.
+
+    Attributes:
+        timeout: Timeout (connexion, lecture) en secondes
+        max_retries: Nombre maximal de nouvelles tentatives
+        backoff_factor: Délai de base (secondes) du backoff exponentiel
+        max_backoff: Délai maximal entre deux tentatives
+        stats: Compteurs de requêtes et d'octets par hôte
+        adapter_factory: Fabrique de l'adaptateur ``requests`` monté pour
+            chaque hôte (par défaut un ``HTTPAdapter`` avec pool keep-alive ;
+            voir ``mtg.replay`` pour l'enregistrement et le rejeu)
+    """
+
+    def __init__(self, timeout: tuple = cts.HTTP_TIMEOUT, max_retries: int = cts.HTTP_MAX_RETRIES,
+                 backoff_factor: float = 0.5, max_backoff: float = 30.0, pool_maxsize: int = 16,
+                 adapter_factory: Optional[Callable[[], BaseAdapter]] = None) -> None:
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.pool_maxsize = pool_maxsize
+        self.adapter_factory = adapter_factory or (
+            lambda: HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+        )
+        self.stats = TransportStats()
+        self._hooks: List[Callable[[str, requests.Response], None]] = [self.stats.record]
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Callable[[str, requests.Response], None]) -> None:
+        """Ajoute une fonction appelée ``hook(host, response)`` après chaque réponse."""
+        self._hooks.append(hook)
+
+    def _session_for(self, host: str) -> requests.Session:
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = self.adapter_factory()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers["User-Agent"] = f"MTG_generator/{cts.VERSION}"
+                self._sessions[host] = session
+            return session
+
+    def _retry_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        """Délai avant la tentative suivante (``Retry-After`` prioritaire)."""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(self.max_backoff, max(0.0, float(retry_after)))
+                except ValueError:
+                    try:
+                        delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                        return min(self.max_backoff, max(0.0, delay))
+                    except (TypeError, ValueError):
+                        pass
+        delay = self.backoff_factor * (2 ** attempt)
+        return min(self.max_backoff, delay + random.uniform(0, self.backoff_factor))
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Envoie une requête HTTP avec timeout et reprises.
+
+        Args:
+            method: Méthode HTTP ("GET", "POST", ...)
+            url: URL complète
+            **kwargs: Arguments transmis à ``requests.Session.request``
+
+        Returns:
+            requests.Response: la dernière réponse obtenue (l'appelant reste
+            responsable de ``raise_for_status``).
+
+        Raises:
+            requests.exceptions.RequestException: si toutes les tentatives
+                échouent au niveau réseau.
+        """
+        host = urlsplit(url).netloc
+        session = self._session_for(host)
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            response = None
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+            if response is not None:
+                for hook in self._hooks:
+                    hook(host, response)
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+            delay = self._retry_delay(attempt, response)
+            attempt += 1
+            self.stats.record_retry(host)
+            logger.warning(f"Nouvelle tentative {attempt}/{self.max_retries} pour {url} dans {delay:.2f}s")
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self) -> None:
+        """Ferme toutes les sessions."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+_default_client: Optional[HttpClient] = None
+_default_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Retourne le client HTTP partagé par toute l'application."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
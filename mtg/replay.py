@@ -0,0 +1,295 @@
+"""Enregistrement et rejeu des réponses Archidekt / Scryfall.
+
+Permet de mesurer et tester les chemins réseau sans dépendre des API :
+
+- ``RecordingAdapter`` enregistre les vraies réponses dans un répertoire de
+  fixtures ;
+- ``ReplayAdapter`` les rejoue en mémoire (transport ``requests``) ;
+- ``ReplayServer`` les sert via un serveur HTTP local.
+
+Les deux modes de rejeu peuvent simuler latence, gigue et erreurs 429.
+
+Exemple ::
+
+    python -m mtg.replay serve data/fixtures --port 8765 --latency 0.05
+
+puis ``ExternalDataProvider(archidekt_api="http://127.0.0.1:8765/api",
+scryfall_api="http://127.0.0.1:8765")``.
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+import logging
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from mtg.http_client import HttpClient
+
+logger = logging.getLogger(__name__)
+
+# En-têtes de réponse conservés dans les fixtures
+_KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Retry-After")
+
+
+def request_key(method: str, url: str, body: Optional[bytes] = None) -> str:
+    """Clé d'une requête, indépendante de l'hôte (rejeu sur un autre serveur).
+
+    Args:
+        method: Méthode HTTP
+        url: URL (ou chemin + query) de la requête
+        body: Corps de la requête (JSON normalisé avant hachage)
+
+    Returns:
+        str: ``"METHOD /chemin?query triée[#hash du corps]"``
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    key = f"{method.upper()} {parts.path}" + (f"?{query}" if query else "")
+    if body:
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode("utf-8")
+        except ValueError:
+            pass
+        key += "#" + hashlib.sha1(body).hexdigest()[:16]
+    return key
+
+
+class FixtureStore:
+    """Répertoire de fixtures : un fichier JSON par requête enregistrée."""
+
+    def __init__(self, fixture_dir: str) -> None:
+        self.fixture_dir = Path(fixture_dir)
+
+    def _path(self, key: str) -> Path:
+        return self.fixture_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+    def save(self, key: str, status: int, headers: Dict[str, str], content: bytes) -> None:
+        """Enregistre une réponse."""
+        self.fixture_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            body, encoding = content.decode("utf-8"), "text"
+        except UnicodeDecodeError:
+            body, encoding = base64.b64encode(content).decode("ascii"), "base64"
+        fixture = {
+            "key": key,
+            "status": status,
+            "headers": {name: headers[name] for name in _KEPT_HEADERS if name in headers},
+            "encoding": encoding,
+            "body": body,
+        }
+        self._path(key).write_text(json.dumps(fixture, ensure_ascii=False, indent=1), encoding="utf-8")
+
+    def load(self, key: str) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        """Retourne (statut, en-têtes, corps) de la réponse enregistrée, ou None."""
+        path = self._path(key)
+        if not path.exists():
+            return None
+        fixture = json.loads(path.read_text(encoding="utf-8"))
+        body = fixture["body"]
+        content = base64.b64decode(body) if fixture.get("encoding") == "base64" else body.encode("utf-8")
+        return fixture["status"], fixture["headers"], content
+
+
+@dataclass
+class ReplayConditions:
+    """Conditions réseau simulées lors du rejeu.
+
+    Attributes:
+        latency: Latence de base par requête (secondes)
+        jitter: Variation aléatoire maximale ajoutée à la latence (secondes)
+        throttle_rate: Probabilité de répondre 429 au lieu de la fixture
+        retry_after: Valeur de ``Retry-After`` des réponses 429 (secondes)
+        seed: Graine du générateur aléatoire (rejeu reproductible)
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: float = 0.0
+    seed: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        self._random = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """Applique latence et gigue."""
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def should_throttle(self) -> bool:
+        """Indique si la requête courante doit recevoir une 429."""
+        if self.throttle_rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < self.throttle_rate
+
+    def resolve(self, store: FixtureStore, key: str) -> Tuple[int, Dict[str, str], bytes]:
+        """Réponse simulée (429, fixture ou 404) pour une requête."""
+        self.wait()
+        if self.should_throttle():
+            return 429, {"Retry-After": str(self.retry_after)}, b""
+        fixture = store.load(key)
+        if fixture is None:
+            logger.warning(f"Aucune fixture pour {key}")
+            return 404, {"Content-Type": "application/json"}, b'{"object": "error", "status": 404}'
+        return fixture
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Adaptateur ``requests`` qui enregistre chaque réponse réelle."""
+
+    def __init__(self, fixture_dir: str, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.store = FixtureStore(fixture_dir)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        # Pas d'enregistrement des réponses transitoires (throttling, erreurs serveur)
+        if response.status_code != 429 and response.status_code < 500:
+            self.store.save(
+                request_key(request.method, request.url, request.body),
+                response.status_code,
+                response.headers,
+                response.content,
+            )
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Transport ``requests`` en mémoire qui rejoue les fixtures."""
+
+    def __init__(self, fixture_dir: str, conditions: Optional[ReplayConditions] = None) -> None:
+        super().__init__()
+        self.store = FixtureStore(fixture_dir)
+        self.conditions = conditions or ReplayConditions()
+
+    def send(self, request, **kwargs):
+        status, headers, content = self.conditions.resolve(
+            self.store, request_key(request.method, request.url, request.body)
+        )
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = content
+        response.url = request.url
+        response.request = request
+        response.encoding = "utf-8"
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+def make_recording_client(fixture_dir: str, **kwargs) -> HttpClient:
+    """Client HTTP réel qui enregistre ses réponses dans ``fixture_dir``."""
+    return HttpClient(adapter_factory=lambda: RecordingAdapter(fixture_dir), **kwargs)
+
+
+def make_replay_client(fixture_dir: str, conditions: Optional[ReplayConditions] = None, **kwargs) -> HttpClient:
+    """Client HTTP hors ligne qui rejoue les fixtures de ``fixture_dir``."""
+    conditions = conditions or ReplayConditions()
+    return HttpClient(adapter_factory=lambda: ReplayAdapter(fixture_dir, conditions), **kwargs)
+
+
+class ReplayServer:
+    """Serveur HTTP local qui sert les fixtures enregistrées.
+
+    Utilisable comme gestionnaire de contexte ; ``url`` donne l'adresse à
+    passer comme ``scryfall_api`` (et ``url + "/api"`` comme
+    ``archidekt_api``).
+    """
+
+    def __init__(self, fixture_dir: str, host: str = "127.0.0.1", port: int = 0,
+                 conditions: Optional[ReplayConditions] = None) -> None:
+        store = FixtureStore(fixture_dir)
+        conditions = conditions or ReplayConditions()
+
+        class _Handler(BaseHTTPRequestHandler):
+            def _reply(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else None
+                status, headers, content = conditions.resolve(store, request_key(self.command, self.path, body))
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = _reply
+            do_POST = _reply
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ReplayServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mtg-replay", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> None:
+    """Point d'entrée ``python -m mtg.replay serve <fixtures>``."""
+    parser = argparse.ArgumentParser(description="Rejeu local des réponses Archidekt / Scryfall")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="Servir un répertoire de fixtures")
+    serve.add_argument("fixture_dir")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--latency", type=float, default=0.0)
+    serve.add_argument("--jitter", type=float, default=0.0)
+    serve.add_argument("--throttle-rate", type=float, default=0.0)
+    serve.add_argument("--retry-after", type=float, default=1.0)
+    serve.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    conditions = ReplayConditions(args.latency, args.jitter, args.throttle_rate, args.retry_after, args.seed)
+    server = ReplayServer(args.fixture_dir, args.host, args.port, conditions)
+    print(f"Rejeu de {args.fixture_dir} sur {server.url} (Ctrl+C pour arrêter)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -25,3 +25,20 @@ def setup_logging(log_level: str = "INFO") -> None:
         level=getattr(logging, log_level.upper()),
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
+
+
+def normalize_card_name(name: str) -> str:
+    """Normalise un nom de carte pour les comparaisons (casse, espaces).
+
+    Args:
+        name: Nom de la carte
+
+    Returns:
+        str: Nom normalisé
+    """
+    return " ".join((name or "").split()).lower()
+
+
+def is_uuid_like(identifier: str) -> bool:
+    """Indique si un identifiant ressemble à un UUID Scryfall."""
+    return len(identifier) in (32, 36) and all(c in "0123456789abcdef-" for c in identifier.lower())
@@ -1,12 +1,59 @@
 """Tests pour le module collection."""
 
+import csv
+import gzip
 import sqlite3
+import threading
+import time
 from pathlib import Path
 
 import pytest
 
 from mtg import constants as cts
 from mtg.collection import CollectionManager
+from mtg.colors import COLORLESS, colors_to_mask
+from mtg.external_data import get_external_provider
+
+
+class FakeCatalog:
+    """Catalogue local vide : toutes les cartes passent par le fournisseur."""
+
+    def lookup(self, identifier):
+        return None
+
+
+class FakeProvider:
+    """Fournisseur Scryfall factice : les cartes inconnues sont des artefacts incolores."""
+
+    def __init__(self):
+        self.calls = []
+        self.batches = []
+        self.catalog = FakeCatalog()
+        # Données renvoyées pour certains identifiants
+        self.cards = {}
+        # Exceptions levées par appel (numéro d'appel -> exception)
+        self.errors = {}
+
+    def _card(self, identifier):
+        return self.cards.get(identifier) or {
+            "oracle_id": f"o-{identifier}", "type_line": "Artifact", "color_identity": [],
+        }
+
+    def get_scryfall_data(self, identifier):
+        self.calls.append(identifier)
+        return self._card(identifier)
+
+    def get_scryfall_data_batch(self, identifiers):
+        self.batches.append(list(identifiers))
+        if len(self.batches) in self.errors:
+            raise self.errors[len(self.batches)]
+        return {i: self._card(i) for i in identifiers}
+
+
+@pytest.fixture
+def fake_provider():
+    """Fournisseur Scryfall factice, sans accès réseau."""
+    return FakeProvider()
 
 
 @pytest.fixture
@@ -20,6 +67,23 @@ def collection_manager(tmp_path):
         manager.conn.close()
 
 
+@pytest.fixture
+def manager_with_provider(tmp_path, monkeypatch):
+    """Crée une base temporaire dont le gestionnaire utilise le fournisseur donné."""
+    managers = []
+
+    def make(provider):
+        monkeypatch.setattr(cts, "DB_PATH", tmp_path / "provider.db")
+        monkeypatch.setattr(cts, "CSV_PATH", None)
+        manager = CollectionManager(external_provider=provider)
+        managers.append(manager)
+        return manager
+
+    yield make
+    for manager in managers:
+        manager.close()
+
+
 def test_init_creates_empty_db(collection_manager, tmp_path):
     db_path = Path(cts.DB_PATH)
     assert db_path.exists()
@@ -68,3 +132,613 @@ def test_search_and_quantity_helpers(collection_manager):
     assert collection_manager.get_card_quantity("Arcane Signet") == 3
     assert collection_manager.has_card("Arcanist's Owl") is True
     assert collection_manager.has_card("Nonexistent Card") is False
+
+
+def test_card_colors_fall_back_to_injected_provider(manager_with_provider, fake_provider):
+    fake_provider.cards = {"Meren of Clan Nel Toth": {"color_identity": ["B", "G"]}}
+    manager = manager_with_provider(fake_provider)
+
+    assert manager.get_card_colors("Meren of Clan Nel Toth") == {"B", "G"}
+    assert fake_provider.calls == ["Meren of Clan Nel Toth"]
+
+
+def test_default_provider_is_shared(collection_manager):
+    assert collection_manager.external_provider is get_external_provider()
+
+
+def test_moxfield_import_is_single_pass_and_throttled(collection_manager, tmp_path):
+    csv_path = tmp_path / "moxfield.csv"
+    lines = ["name,scryfall_id,colors,types,quantity"]
+    lines += [f"Card {i},id-{i},g,Creature,{i % 4 + 1}" for i in range(5000)]
+    lines.append("Card 0,id-0,g,Creature,1")
+    csv_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    progress = []
+    labels = []
+
+    collection_manager.load_from_csv(str(csv_path), "Moxfield", progress_cb=progress.append, label_cb=labels.append)
+
+    with collection_manager._get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0] == 5000
+    assert collection_manager.find_card_by_name("card 42")["colors"] == "G"
+    assert progress == sorted(progress) and progress[-1] == 100
+    assert len(progress) < 100
+    assert labels[-1] == "Import Moxfield (5001 lignes, 100 %)"
+
+
+def test_imports_fill_derived_columns_without_follow_up_updates(collection_manager, tmp_path):
+    conn = collection_manager.conn
+    # Compte les UPDATE de rattrapage déclenchés par les triggers d'insertion
+    conn.executescript("""
+        CREATE TEMP TABLE derived_updates (col TEXT);
+        CREATE TEMP TRIGGER count_name_norm AFTER UPDATE OF name_norm ON cards BEGIN
+            INSERT INTO derived_updates VALUES ('name_norm');
+        END;
+        CREATE TEMP TRIGGER count_color_mask AFTER UPDATE OF color_mask ON cards BEGIN
+            INSERT INTO derived_updates VALUES ('color_mask');
+        END;
+        CREATE TEMP TRIGGER count_commander AFTER UPDATE OF is_commander_eligible ON cards BEGIN
+            INSERT INTO derived_updates VALUES ('is_commander_eligible');
+        END;
+    """)
+    csv_path = tmp_path / "moxfield.csv"
+    csv_path.write_text(
+        "name,scryfall_id,colors,types,quantity\n Sol Ring ,s-1,,Artifact,1\nLlanowar Elves,s-2,g,Creature,1\n"
+        "Meren of Clan Nel Toth,s-3,bg,Legendary Creature — Human Shaman,1\n",
+        encoding="utf-8",
+    )
+
+    collection_manager.load_from_csv(str(csv_path), "Moxfield")
+
+    assert conn.execute("SELECT col FROM derived_updates").fetchall() == []
+    assert collection_manager.find_card_by_name("sol ring")["scryfall_id"] == "s-1"
+    assert collection_manager.find_card_by_name("llanowar elves")["color_mask"] == colors_to_mask("G")
+    assert collection_manager.get_commander_candidates() == ["Meren of Clan Nel Toth"]
+    # Les insertions sans colonnes dérivées restent rattrapées
+    conn.execute(
+        "INSERT INTO cards (name, quantity, colors, types) VALUES (' Atraxa', 1, 'WUBG', 'Legendary Creature')"
+    )
+    card = collection_manager.find_card_by_name("atraxa")
+    assert (card["color_mask"], card["is_commander_eligible"]) == (colors_to_mask("WUBG"), 1)
+
+
+def test_manabox_import_inserts_batches(manager_with_provider, fake_provider, tmp_path):
+    class OracleCatalog:
+        # Catalogue oracle : une autre impression que celle de la collection
+        def lookup(self, name):
+            index = int(name.split()[-1])
+            if index >= 50:
+                return None
+            return {"id": f"other-{index}", "oracle_id": f"o-{name}", "type_line": "Artifact", "color_identity": [],
+                    "image_uris": {"normal": "img-other"}}
+
+    fake_provider.catalog = OracleCatalog()
+    manager = manager_with_provider(fake_provider)
+    csv_path = tmp_path / "manabox.csv"
+    lines = ["Name,Set code,Set name,Collector number,Foil,Rarity,Quantity,Scryfall ID,Condition,Language"]
+    lines += [f"Card {i},SET,Set,{i},foil,rare,2,s-{i},NM,English" for i in range(200)]
+    csv_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    manager.load_from_csv(str(csv_path), "ManaBox - Collection")
+
+    # Les 50 cartes du catalogue local ne passent pas par le réseau
+    assert [len(batch) for batch in fake_provider.batches] == [25, 75, 50]
+    card = manager.find_card_by_scryfallID("s-3")
+    assert (card["oracle_id"], card["image_url"]) == ("o-Card 3", "")
+    card = manager.find_card_by_scryfallID("s-199")
+    assert (card["oracle_id"], card["colors"], card["foil"], card["quantity"]) == ("o-s-199", "['colorless']", 1, 2)
+
+
+def test_resumable_import_recovers_from_crash_and_queues_failures(manager_with_provider, fake_provider, tmp_path,
+                                                                 monkeypatch):
+    monkeypatch.setattr(cts, "IMPORT_BATCH_SIZE", 10)
+    fake_provider.errors = {2: ValueError("Scryfall indisponible"), 4: RuntimeError("interruption")}
+    manager = manager_with_provider(fake_provider)
+    csv_path = tmp_path / "manabox.csv"
+    lines = ["Name,Set code,Set name,Collector number,Foil,Rarity,Quantity,Scryfall ID,Condition,Language"]
+    lines += [f"Card {i},SET,Set,{i},,common,1,s-{i},NM,English" for i in range(1, 51)]
+    csv_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    with pytest.raises(RuntimeError):
+        manager.load_from_csv(str(csv_path), "ManaBox - Collection", resumable=True)
+    conn = manager._get_connection()
+    assert conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0] == 20
+    assert conn.execute("SELECT row_offset FROM import_checkpoints").fetchone()[0] == 30
+    assert conn.execute("SELECT COUNT(*) FROM import_retry_queue").fetchone()[0] == 10
+
+    manager.load_from_csv(str(csv_path), "ManaBox - Collection", resumable=True)
+
+    assert fake_provider.batches[4][0] == "s-31"
+    assert conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0] == 50
+    assert conn.execute("SELECT COUNT(*) FROM import_retry_queue").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM import_checkpoints").fetchone()[0] == 0
+
+
+def test_legacy_database_is_migrated_and_finders_use_indexes(tmp_path):
+    db_path = tmp_path / "legacy.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("""
+            CREATE TABLE cards (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, colors TEXT, types TEXT,
+                quantity INTEGER NOT NULL DEFAULT 1, scryfall_id TEXT, oracle_id TEXT, set_code TEXT,
+                set_name TEXT, collector_number TEXT, image_url TEXT, foil INTEGER DEFAULT 0, rarity TEXT,
+                card_condition TEXT, language TEXT, UNIQUE(name, scryfall_id)
+            )
+        """)
+        conn.execute("INSERT INTO cards (name, quantity, scryfall_id, oracle_id) VALUES (' Sol Ring', 2, 's-1', 'o-1')")
+    conn.close()
+
+    cts.DB_PATH = db_path
+    cts.CSV_PATH = None
+    manager = CollectionManager(external_provider=object())
+    conn = manager._get_connection()
+
+    assert conn.execute("PRAGMA user_version").fetchone()[0] >= 1
+    assert manager.find_card_by_name("sol ring ")["quantity"] == 2
+    ownership = manager.get_card_ownership("Sol Ring")
+    assert (ownership["owner_key"], ownership["quantity"], ownership["scryfall_id"]) == ("o-1", 2, "s-1")
+    conn.execute("INSERT INTO cards (name, quantity) VALUES ('Arcane Signet', 1)")
+    conn.execute("UPDATE cards SET name = 'SOL RING' WHERE scryfall_id = 's-1'")
+    assert manager.find_card_by_name("arcane signet")["quantity"] == 1
+    assert manager.find_card_by_name("Sol Ring")["name"] == "SOL RING"
+
+    for sql, params in [
+        ("SELECT * FROM cards WHERE name_norm = LOWER(TRIM(?))", ("x",)),
+        ("SELECT * FROM cards WHERE oracle_id = ?", ("x",)),
+        ("SELECT * FROM cards WHERE scryfall_id = ?", ("x",)),
+    ]:
+        plan = " ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+        assert "USING INDEX" in plan
+
+    # Une seconde ouverture n'applique aucune migration
+    CollectionManager(external_provider=object()).conn.close()
+    manager.conn.close()
+
+
+def test_compare_deck_to_collection_matches_by_oracle_then_name(collection_manager):
+    with collection_manager._get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO cards (name, quantity, scryfall_id, oracle_id, colors, types, image_url) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                ("Sol Ring", 1, "s-1", "o-sol", "['colorless']", "Artifact", "img-1"),
+                ("Sol Ring", 3, "s-2", "o-sol", "['colorless']", "Artifact", "img-2"),
+                ("Forest", 10, "s-3", None, "[]", "Basic Land — Forest", "img-3"),
+            ],
+        )
+    deck = {
+        "Missing Card": {"oracle_id": "o-none", "quantity": 1, "edhrec_rank": 5, "defaultCategory": None, "occurence": 1},
+        "Forest": {"oracle_id": "o-forest", "quantity": 12, "edhrec_rank": None, "defaultCategory": None, "occurence": 4},
+        "Sol Ring": {"oracle_id": "o-sol", "quantity": 1, "edhrec_rank": 1, "defaultCategory": "Ramp", "occurence": 9},
+    }
+
+    results = collection_manager.compare_deck_to_collection(deck)
+
+    assert [r["name"] for r in results] == ["Forest", "Sol Ring"]
+    assert results[0] == {
+        "name": "Forest", "colors": "[]", "color_mask": 0, "types": "Basic Land — Forest", "scryfall_id": "s-3",
+        "image_url": "img-3", "edhrec_rank": None, "occurence": 4, "defaultCategory": "Land",
+        "needed": 12, "owned": 10, "missing": 2,
+    }
+    # Toutes les impressions sont cumulées ; la plus possédée sert de référence
+    assert (results[1]["scryfall_id"], results[1]["owned"], results[1]["defaultCategory"]) == ("s-2", 4, "Ramp")
+    assert collection_manager.compare_deck_to_collection({}) == []
+
+
+def test_color_mask_is_maintained_from_legacy_text(collection_manager):
+    with collection_manager._get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO cards (name, quantity, colors) VALUES (?, ?, ?)",
+            [("Sol Ring", 1, "['colorless']"), ("Meren", 1, "['B', 'G']"), ("Forest", 1, "[]"), ("Moxfield", 1, "WU")],
+        )
+        conn.execute("UPDATE cards SET colors = \"['R']\" WHERE name = 'Forest'")
+
+    assert collection_manager.get_card_color_mask("Sol Ring") == COLORLESS
+    assert collection_manager.get_card_colors("Meren") == {"B", "G"}
+    assert collection_manager.get_card_color_mask("Moxfield") == colors_to_mask("WU")
+    assert collection_manager.get_card_colors("Forest") == {"R"}
+
+
+def test_commander_candidates_use_precomputed_flag(manager_with_provider, fake_provider, tmp_path):
+    fake_provider.cards = {
+        "s-teferi": {"type_line": "Legendary Planeswalker — Teferi",
+                     "oracle_text": "Teferi, Temporal Archmage can be your commander."},
+        "s-chandra": {"type_line": "Legendary Planeswalker — Chandra", "oracle_text": "+1: Deal 2 damage."},
+    }
+    manager = manager_with_provider(fake_provider)
+    csv_path = tmp_path / "manabox.csv"
+    csv_path.write_text(
+        "Name,Set code,Set name,Collector number,Foil,Rarity,Quantity,Scryfall ID,Condition,Language\n"
+        "\"Teferi, Temporal Archmage\",C14,Commander 2014,1,,mythic,1,s-teferi,NM,English\n"
+        "\"Chandra, Torch of Defiance\",KLD,Kaladesh,2,,mythic,1,s-chandra,NM,English\n",
+        encoding="utf-8",
+    )
+    manager.load_from_csv(str(csv_path), "ManaBox - Collection")
+    with manager._get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO cards (name, scryfall_id, types) VALUES (?, ?, ?)",
+            [("Meren of Clan Nel Toth", "m-1", "Legendary Creature — Human Shaman"),
+             ("meren of clan nel toth", "m-2", "Legendary Creature — Human Shaman"),
+             ("Llanowar Elves", "l-1", "Creature — Elf Druid")],
+        )
+        plan = " ".join(row[3] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT MIN(name) FROM cards WHERE is_commander_eligible = 1 GROUP BY name_norm"
+        ))
+    assert "idx_cards_commander" in plan
+
+    assert manager.get_commander_candidates() == ["Meren of Clan Nel Toth", "Teferi, Temporal Archmage"]
+    rows = manager.get_commander_candidates(get_all=True)
+    assert [row["scryfall_id"] for row in rows] == ["m-1", "s-teferi"]
+
+
+def test_full_text_search_is_synced_prefix_and_ranked(collection_manager):
+    with collection_manager._get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO cards (name, quantity, scryfall_id, types, set_name, collector_number) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                ("Sol Ring", 1, "s-1", "Artifact", "Commander Legends", "1"),
+                ("Lightning Bolt", 1, "s-2", "Instant", "Magic 2010", "146"),
+                ("Séance", 1, "s-3", "Enchantment", "Saviors of Kamigawa", "20"),
+                ("Goblin Guide", 1, "s-4", "Creature — Goblin Scout", "Zendikar", "126"),
+                ("Shock", 1, "s-5", "Instant", "Bolt Collection", "7"),
+            ],
+        )
+        conn.execute("UPDATE cards SET name = 'Chain Lightning' WHERE scryfall_id = 's-4'")
+        conn.execute("DELETE FROM cards WHERE scryfall_id = 's-1'")
+
+    def names(query):
+        return [card["name"] for card in collection_manager.search_cards(query, full_text=True)]
+
+    assert names("bol") == ["Lightning Bolt", "Shock"]
+    assert sorted(names("light")) == ["Chain Lightning", "Lightning Bolt"]
+    assert names("goblin scout") == ["Chain Lightning"]
+    assert names("seance") == ["Séance"]
+    assert names("sol") == []
+    assert names("146") == ["Lightning Bolt"]
+    assert len(collection_manager.search_cards("", full_text=True, limit=2)) == 2
+
+
+def test_full_text_search_scales_to_large_collections(collection_manager):
+    with collection_manager._get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO cards (name, quantity, scryfall_id, types, set_name, collector_number) VALUES (?, ?, ?, ?, ?, ?)",
+            [(f"Card {i} Dragon" if i % 100 == 0 else f"Card {i}", 1, f"s-{i}", "Creature", "Set", str(i))
+             for i in range(30000)],
+        )
+    statements = []
+    collection_manager.conn.set_trace_callback(statements.append)
+    results = collection_manager.search_cards("drag", full_text=True)
+    collection_manager.conn.set_trace_callback(None)
+    assert len(results) == 300
+
+    # La requête exécutée passe par l'index FTS puis par la clé primaire de cards
+    sql = next(statement for statement in statements if "MATCH" in statement)
+    plan = " ".join(row[-1] for row in collection_manager.conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+    assert "SCAN cards_fts VIRTUAL TABLE" in plan
+    assert "SEARCH c USING INTEGER PRIMARY KEY" in plan
+
+
+def test_readers_are_not_blocked_by_a_writer_in_another_thread(collection_manager):
+    with collection_manager._db.writer() as conn:
+        conn.execute("INSERT INTO cards (name, quantity) VALUES ('Sol Ring', 1)")
+    assert collection_manager.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    writing = threading.Event()
+    release = threading.Event()
+    worker_conn = []
+
+    def import_in_background():
+        with collection_manager._db.writer() as conn:
+            worker_conn.append(conn)
+            conn.execute("INSERT INTO cards (name, quantity) VALUES ('Arcane Signet', 1)")
+            writing.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=import_in_background)
+    thread.start()
+    assert writing.wait(5)
+    start = time.perf_counter()
+    # Lecture sur le thread principal pendant la transaction d'écriture
+    assert collection_manager.find_card_by_name("Sol Ring")["quantity"] == 1
+    assert collection_manager.find_card_by_name("Arcane Signet") is None
+    assert time.perf_counter() - start < 0.5
+    assert worker_conn[0] is not collection_manager.conn
+    release.set()
+    thread.join()
+    assert collection_manager.find_card_by_name("Arcane Signet")["quantity"] == 1
+
+
+def test_sync_skips_unchanged_files_and_applies_row_deltas(collection_manager, tmp_path):
+    csv_path = tmp_path / "moxfield.csv"
+    header = "name,scryfall_id,colors,types,quantity\n"
+    csv_path.write_text(header + "Sol Ring,s-1,,Artifact,1\nForest,s-2,,Land,8\nForest,s-2,,Land,2\nShock,s-3,R,Instant,1\n",
+                        encoding="utf-8")
+
+    first = collection_manager.sync_from_csv(str(csv_path), "Moxfield")
+    assert (first["inserted"], first["updated"], first["deleted"]) == (3, 0, 0)
+    assert collection_manager.find_card_by_name("Forest")["quantity"] == 10
+    assert collection_manager.is_synced_source(str(csv_path))
+
+    assert collection_manager.sync_from_csv(str(csv_path), "Moxfield")["skipped"] == 1
+
+    # Carte ajoutée hors synchronisation : reste intacte
+    with collection_manager._db.writer() as conn:
+        conn.execute("INSERT INTO cards (name, scryfall_id, quantity) VALUES ('Arcane Signet', 's-9', 1)")
+    csv_path.write_text(header + "Sol Ring,s-1,,Artifact,2\nForest,s-2,,Land,10\nCounterspell,s-4,U,Instant,1\n",
+                        encoding="utf-8")
+
+    delta = collection_manager.sync_from_csv(str(csv_path), "Moxfield")
+
+    assert {k: delta[k] for k in ("inserted", "updated", "deleted", "unchanged")} == {
+        "inserted": 1, "updated": 1, "deleted": 1, "unchanged": 1,
+    }
+    assert collection_manager.get_card_quantity("Sol Ring") == 2
+    assert collection_manager.find_card_by_name("Shock") is None
+    assert collection_manager.get_card_quantity("Counterspell") == 1
+    assert collection_manager.get_card_quantity("Arcane Signet") == 1
+
+
+def test_first_sync_reads_the_file_once_and_skips_identical_cards(collection_manager, tmp_path, monkeypatch):
+    csv_path = tmp_path / "moxfield.csv"
+    csv_path.write_text("name,scryfall_id,colors,types,quantity\nSol Ring,s-1,,Artifact,1\nShock,s-3,R,Instant,2\n",
+                        encoding="utf-8")
+    collection_manager.load_from_csv(str(csv_path), "Moxfield")
+
+    # Source inconnue : l'empreinte est calculée pendant la lecture des lignes
+    def fail(path):
+        raise AssertionError("second passage sur le fichier")
+
+    monkeypatch.setattr(collection_manager, "_file_hash", fail)
+    counts = collection_manager.sync_from_csv(str(csv_path), "Moxfield")
+
+    assert {k: counts[k] for k in ("inserted", "updated", "unchanged")} == {"inserted": 0, "updated": 0, "unchanged": 2}
+    assert collection_manager.is_synced_source(str(csv_path))
+    assert collection_manager.get_card_quantity("Shock") == 2
+    monkeypatch.undo()
+    assert collection_manager.sync_from_csv(str(csv_path), "Moxfield")["skipped"] == 1
+
+
+def test_sync_tracks_added_rows_that_match_existing_cards(collection_manager, tmp_path):
+    with collection_manager._db.writer() as conn:
+        conn.execute("INSERT INTO cards (name, scryfall_id, quantity) VALUES ('Sol Ring', 's-1', 1)")
+    csv_path = tmp_path / "moxfield.csv"
+    header = "name,scryfall_id,colors,types,quantity\n"
+    csv_path.write_text(header + "Shock,s-3,R,Instant,1\n", encoding="utf-8")
+    collection_manager.sync_from_csv(str(csv_path), "Moxfield")
+
+    # Une ligne retirée, une ligne ajoutée qui correspond à une carte existante
+    csv_path.write_text(header + "Sol Ring,s-1,,Artifact,3\n", encoding="utf-8")
+    counts = collection_manager.sync_from_csv(str(csv_path), "Moxfield")
+
+    assert (counts["inserted"], counts["updated"], counts["deleted"]) == (0, 1, 1)
+    assert collection_manager.get_card_quantity("Sol Ring") == 3
+    rows = collection_manager.conn.execute("SELECT row_key FROM import_rows").fetchall()
+    assert [row["row_key"] for row in rows] == ["sol ring|s-1"]
+
+
+def test_sync_only_deletes_cards_no_other_source_tracks(collection_manager, tmp_path):
+    header = "name,scryfall_id,colors,types,quantity\n"
+    deck = tmp_path / "deck.csv"
+    binder = tmp_path / "binder.csv"
+    deck.write_text(header + "Sol Ring,s-1,,Artifact,1\nShock,s-3,R,Instant,1\n", encoding="utf-8")
+    binder.write_text(header + "Sol Ring,s-1,,Artifact,1\n", encoding="utf-8")
+    collection_manager.sync_from_csv(str(deck), "Moxfield")
+    collection_manager.sync_from_csv(str(binder), "Moxfield")
+
+    deck.write_text(header, encoding="utf-8")
+    counts = collection_manager.sync_from_csv(str(deck), "Moxfield")
+
+    assert counts["deleted"] == 1
+    assert collection_manager.find_card_by_name("Shock") is None
+    assert collection_manager.get_card_quantity("Sol Ring") == 1
+    assert collection_manager.sync_from_csv(str(binder), "Moxfield")["skipped"] == 1
+
+
+def test_sync_with_untracked_rows_is_retried(manager_with_provider, fake_provider, tmp_path):
+    fake_provider.errors = {1: ValueError("Scryfall indisponible")}
+    manager = manager_with_provider(fake_provider)
+    csv_path = tmp_path / "manabox.csv"
+    csv_path.write_text(
+        "Name,Set code,Set name,Collector number,Foil,Rarity,Quantity,Scryfall ID,Condition,Language\n"
+        "Sol Ring,C15,C15,1,,uncommon,1,s-1,NM,English\n",
+        encoding="utf-8",
+    )
+
+    assert manager.sync_from_csv(str(csv_path), "ManaBox - Collection")["failed"] == 1
+    retry = manager.sync_from_csv(str(csv_path), "ManaBox - Collection")
+
+    assert (retry["skipped"], retry["inserted"]) == (0, 1)
+    assert manager.sync_from_csv(str(csv_path), "ManaBox - Collection")["skipped"] == 1
+
+
+def test_manabox_sync_adopts_previously_imported_cards(manager_with_provider, fake_provider, tmp_path):
+    manager = manager_with_provider(fake_provider)
+    csv_path = tmp_path / "manabox.csv"
+    header = "Name,Set code,Set name,Collector number,Foil,Rarity,Quantity,Scryfall ID,Condition,Language\n"
+    csv_path.write_text(header + "Sol Ring,C15,C15,1,,uncommon,1,s-1,NM,English\n", encoding="utf-8")
+    manager.load_from_csv(str(csv_path), "ManaBox - Collection")
+
+    csv_path.write_text(header + "Sol Ring,C15,C15,1,foil,uncommon,3,s-1,NM,English\n"
+                        "Mind Stone,C15,C15,2,,common,1,s-2,NM,English\n", encoding="utf-8")
+    counts = manager.sync_from_csv(str(csv_path), "ManaBox - Collection")
+
+    assert (counts["inserted"], counts["updated"]) == (1, 1)
+    sol_ring = manager.find_card_by_scryfallID("s-1")
+    assert (sol_ring["quantity"], sol_ring["foil"]) == (3, 1)
+    assert manager.find_card_by_scryfallID("s-2")["oracle_id"] == "o-s-2"
+
+
+def test_exports_stream_large_id_lists_and_support_gzip(collection_manager, tmp_path):
+    count = 40000
+    with collection_manager._get_connection() as conn:
+        conn.executemany(
+            """
+            INSERT INTO cards (name, quantity, scryfall_id, set_code, collector_number, colors, types)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [(f"Card {i:05d}", 1, f"scry-{i}", "SET", str(i), "['G']", "Creature") for i in range(count)],
+        )
+
+    # Plus d'identifiants que la limite de paramètres de SQLite
+    ids = [f"scry-{i}" for i in range(count)] + ["scry-0", "unknown"]
+    txt_path = tmp_path / "deck.txt"
+    collection_manager.export_db_list_cards_to_txt(ids, str(txt_path))
+    lines = txt_path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == count
+    assert lines[0] == "1x Card 00000 (SET) 0"
+
+    gz_txt_path = tmp_path / "deck.txt.gz"
+    collection_manager.export_db_list_cards_to_txt(ids[:3], str(gz_txt_path))
+    with gzip.open(gz_txt_path, "rt", encoding="utf-8") as f:
+        assert f.read().splitlines() == lines[:3]
+
+    csv_path = tmp_path / "collection.csv"
+    gz_csv_path = tmp_path / "collection.csv.gz"
+    collection_manager.export_db_to_csv(str(csv_path))
+    collection_manager.export_db_to_csv(str(gz_csv_path))
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        plain_rows = list(csv.DictReader(f))
+    with gzip.open(gz_csv_path, "rt", newline="", encoding="utf-8") as f:
+        assert list(csv.DictReader(f)) == plain_rows
+
+    assert len(plain_rows) == count
+    assert plain_rows[1]["name"] == "Card 00001"
+    assert plain_rows[1]["scryfall_id"] == "scry-1"
+    assert plain_rows[1]["foil"] == "0"
+    assert plain_rows[1]["rarity"] == ""
+
+
+def test_exports_skip_empty_results(collection_manager, tmp_path):
+    csv_path = tmp_path / "empty.csv"
+    collection_manager.export_db_to_csv(str(csv_path))
+    assert not csv_path.exists()
+
+    txt_path = tmp_path / "empty.txt"
+    collection_manager.export_db_list_cards_to_txt(["missing"], str(txt_path))
+    assert not txt_path.exists()
+
+
+def test_query_cards_pages_by_keyset_with_filters(collection_manager):
+    rows = [(f"Card {i:03d}", 2, "['G']" if i % 2 else "['W', 'G']", "Creature — Elf" if i % 3 else "Instant")
+            for i in range(250)]
+    # Homonymes : départagés par id
+    rows += [("card 010", 1, "['W', 'G']", "Instant")] * 2
+    with collection_manager._get_connection() as conn:
+        conn.executemany("INSERT INTO cards (name, quantity, colors, types) VALUES (?, ?, ?, ?)", rows)
+
+    seen = []
+    page = collection_manager.query_cards(limit=100)
+    assert (page.total, page.total_quantity) == (252, 502)
+    while True:
+        seen.extend(card["id"] for card in page.cards)
+        if page.next_cursor is None:
+            break
+        page = collection_manager.query_cards(after=page.next_cursor, limit=100, count=False)
+        assert page.total is None
+    assert len(seen) == len(set(seen)) == 252
+    names = [collection_manager.conn.execute("SELECT name_norm FROM cards WHERE id = ?", (i,)).fetchone()[0]
+             for i in seen]
+    assert names == sorted(names)
+
+    white = collection_manager.query_cards(color_mask=colors_to_mask("W"), card_type="instant", limit=10)
+    expected = sum(1 for i in range(250) if i % 2 == 0 and i % 3 == 0) + 2
+    assert white.total == expected
+    assert all("W" in card["colors"] and card["types"] == "Instant" for card in white.cards)
+
+    text = collection_manager.query_cards(text="card 01", limit=500)
+    assert {card["name"].lower() for card in text.cards} == {f"card {i:03d}" for i in range(10, 20)}
+    assert text.next_cursor is None
+
+    plan = " ".join(
+        row[-1] for row in collection_manager.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM cards WHERE (name_norm, id) > (?, ?) ORDER BY name_norm, id LIMIT 10",
+            ("card 100", 0),
+        )
+    )
+    assert "idx_cards_name_norm" in plan and "TEMP B-TREE" not in plan
+
+    colors, types = collection_manager.get_collection_filter_values()
+    assert colors == ["G", "W"]
+    assert types == ["Creature", "Instant"]
+
+
+def test_card_ownership_is_aggregated_and_maintained_by_triggers(collection_manager):
+    conn = collection_manager.conn
+
+    def ownership(key):
+        row = conn.execute(
+            "SELECT quantity, printings, scryfall_id, image_url, color_mask FROM card_ownership WHERE owner_key = ?",
+            (key,),
+        ).fetchone()
+        return tuple(row) if row else None
+
+    with collection_manager._get_connection() as c:
+        c.executemany(
+            "INSERT INTO cards (name, quantity, scryfall_id, oracle_id, colors, types, image_url) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                ("Llanowar Elves", 2, "s-1", "o-elves", "['G']", "Creature — Elf Druid", ""),
+                ("Llanowar Elves", 1, "s-2", "o-elves", "['G']", "Creature — Elf Druid", "img-2"),
+                ("Forest", 5, "s-3", None, "[]", "Basic Land — Forest", None),
+            ],
+        )
+    green = colors_to_mask("G")
+    # L'impression avec image prime sur la plus possédée (image vide : pas d'image)
+    assert ownership("o-elves") == (3, 2, "s-2", "img-2", green)
+    assert ownership("forest") == (5, 1, "s-3", None, 0)
+
+    with collection_manager._get_connection() as c:
+        c.execute("UPDATE cards SET quantity = 4, image_url = 'img-1' WHERE scryfall_id = 's-1'")
+    assert ownership("o-elves") == (5, 2, "s-1", "img-1", green)
+    assert collection_manager.get_card_quantity("llanowar elves") == 5
+    assert collection_manager.get_card_color_mask("Llanowar Elves") == green
+
+    # Une impression qui ne devient pas la référence ne fait que varier les totaux
+    conn.executescript("""
+        CREATE TEMP TABLE reference_picks (owner_key TEXT);
+        CREATE TEMP TRIGGER count_reference_picks AFTER UPDATE OF best_id ON card_ownership BEGIN
+            INSERT INTO reference_picks VALUES (NEW.owner_key);
+        END;
+    """)
+    with collection_manager._get_connection() as c:
+        c.execute("INSERT INTO cards (name, quantity, scryfall_id, oracle_id, colors) VALUES "
+                  "('Llanowar Elves', 1, 's-4', 'o-elves', 'G')")
+        c.execute("UPDATE cards SET colors = 'G', quantity = 2 WHERE scryfall_id = 's-4'")
+    assert ownership("o-elves") == (7, 3, "s-1", "img-1", green)
+    assert conn.execute("SELECT COUNT(*) FROM reference_picks").fetchone()[0] == 0
+    with collection_manager._get_connection() as c:
+        c.execute("DELETE FROM cards WHERE scryfall_id = 's-4'")
+
+    # Une carte qui change d'oracle_id quitte son ancien groupe
+    with collection_manager._get_connection() as c:
+        c.execute("UPDATE cards SET oracle_id = 'o-forest' WHERE scryfall_id = 's-3'")
+    assert ownership("forest") is None
+    assert ownership("o-forest") == (5, 1, "s-3", None, 0)
+
+    with collection_manager._get_connection() as c:
+        c.execute("DELETE FROM cards WHERE scryfall_id = 's-1'")
+    assert ownership("o-elves") == (1, 1, "s-2", "img-2", green)
+
+    collection_manager.clear_all_cards()
+    assert conn.execute("SELECT COUNT(*) FROM card_ownership").fetchone()[0] == 0
+
+
+def test_card_color_masks_are_resolved_in_batch(manager_with_provider, fake_provider):
+    fake_provider.cards = {"Counterspell": {"color_identity": ["U"]}}
+    manager = manager_with_provider(fake_provider)
+    with manager._get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO cards (name, quantity, colors) VALUES (?, ?, ?)",
+            [("Llanowar Elves", 1, "['G']"), ("Sol Ring", 1, "['colorless']")],
+        )
+
+    masks = manager.get_card_color_masks(
+        ["llanowar elves", "Sol Ring", "Counterspell", "Nonexistent", "Sol Ring", ""]
+    )
+
+    assert masks == {
+        "llanowar elves": colors_to_mask("G"),
+        "Sol Ring": COLORLESS,
+        "Counterspell": colors_to_mask("U"),
+        "Nonexistent": 0,
+    }
+    assert fake_provider.batches == [["Counterspell", "Nonexistent"]]
+    assert fake_provider.calls == []
+    assert manager.get_card_color_masks([]) == {}
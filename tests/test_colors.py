@@ -0,0 +1,35 @@
+"""Tests pour le module colors."""
+
+import sqlite3
+
+import pytest
+
+from mtg.colors import (
+    ALL_COLORS, COLORLESS, color_mask_sql, colors_to_mask, format_colors, is_within_identity, mask_to_colors,
+)
+
+
+@pytest.mark.parametrize("value, expected", [
+    (["W", "U"], 0b00011),
+    ("['B', 'R', 'G']", 0b11100),
+    ("['colorless']", COLORLESS),
+    ("wubrg", ALL_COLORS),
+    ("[]", 0),
+    (None, 0),
+])
+def test_colors_to_mask_matches_sql_expression(value, expected):
+    assert colors_to_mask(value) == expected
+    if value is None or isinstance(value, str):
+        with sqlite3.connect(":memory:") as conn:
+            sql = f"SELECT {color_mask_sql('value')} FROM (SELECT ? AS value)"
+            assert conn.execute(sql, (value,)).fetchone()[0] == expected
+
+
+def test_mask_helpers():
+    assert mask_to_colors(colors_to_mask(["G", "W"])) == ["W", "G"]
+    assert format_colors(COLORLESS) == "colorless"
+    assert format_colors(None) == ""
+    assert is_within_identity(colors_to_mask("G"), colors_to_mask("BG"))
+    assert not is_within_identity(colors_to_mask("R"), colors_to_mask("BG"))
+    # Les cartes incolores sont jouables avec tout commandant
+    assert is_within_identity(COLORLESS, colors_to_mask("U"))
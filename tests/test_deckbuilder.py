@@ -0,0 +1,44 @@
+"""Tests pour le module deckbuilder."""
+
+from types import SimpleNamespace
+
+from mtg.colors import colors_to_mask
+from mtg.deckbuilder import DeckBuilder
+
+
+class FakeCollection:
+    def __init__(self, masks):
+        self.masks = masks
+        self.single_calls = []
+        self.batch_calls = []
+
+    def get_card_color_mask(self, name):
+        self.single_calls.append(name)
+        return self.masks.get(name, 0)
+
+    def get_card_color_masks(self, names):
+        self.batch_calls.append(list(names))
+        return {name: self.masks.get(name, 0) for name in names}
+
+
+def test_score_cards_resolves_color_identities_in_one_batch():
+    collection = FakeCollection({"Meren": colors_to_mask("BG"), "Unknown Blue": colors_to_mask("U")})
+    app = SimpleNamespace(collection_manager=collection)
+    candidates = [
+        {"name": f"Card {i}", "color_mask": colors_to_mask("R" if i % 4 == 0 else "BG"),
+         "occurence": i % 50, "edhrec_rank": i, "defaultCategory": "Ramp"}
+        for i in range(2000)
+    ]
+    # Entrées sans masque (hors comparaison) : résolues par lot
+    candidates += [
+        {"name": "Unknown Blue", "occurence": 1, "edhrec_rank": 1, "defaultCategory": None},
+        {"name": "Unknown Colorless", "occurence": 1, "edhrec_rank": 1, "defaultCategory": None},
+    ]
+
+    builder = DeckBuilder(app, "Meren", candidates, external_provider=object())
+
+    assert collection.single_calls == ["Meren"]
+    assert collection.batch_calls == [["Unknown Blue", "Unknown Colorless"]]
+    names = {card["name"] for card in builder.scored_cards}
+    assert len(names) == 1500 + 1
+    assert "Card 4" not in names and "Unknown Blue" not in names and "Unknown Colorless" in names
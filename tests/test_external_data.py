@@ -0,0 +1,511 @@
+"""Tests pour le module external_data."""
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from mtg.async_external_data import AsyncExternalDataProvider, BlockingExternalDataProvider
+from mtg.card_cache import CardCache
+from mtg.card_catalog import CardCatalog
+from mtg.concurrency import SingleFlight, TokenBucket
+from mtg.deck_store import DeckStore
+from mtg.external_data import ArchidektDeckMerger, ExternalDataProvider
+from mtg.http_cache import HttpCache
+from mtg.http_client import HttpClient, TransportStats
+from mtg.replay import ReplayConditions, ReplayServer, make_recording_client, make_replay_client
+
+
+SOL_RING = {
+    "id": "0afa0e33-4804-4b00-b625-c2d6b61090fc",
+    "oracle_id": "6ad8011d-3471-4369-9d68-b264cc027487",
+    "name": "Sol Ring",
+    "type_line": "Artifact",
+    "color_identity": [],
+    "cmc": 1.0,
+    "image_uris": {"normal": "https://img/sol-ring.jpg"},
+}
+DELVER = {
+    "id": "11bf83bb-c95b-4b4f-9a56-ce7a1816307a",
+    "oracle_id": "7b3ca3a1-a6d3-4b2e-9d1a-0c2a5d6c8b16",
+    "name": "Delver of Secrets // Insectile Aberration",
+    "type_line": "Creature — Human Wizard // Creature — Human Insect",
+    "color_identity": ["U"],
+    "cmc": 1.0,
+    "card_faces": [
+        {"name": "Delver of Secrets", "image_uris": {"normal": "https://img/delver-front.jpg"}},
+        {"name": "Insectile Aberration", "image_uris": {"normal": "https://img/delver-back.jpg"}},
+    ],
+}
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    """Catalogue construit depuis un petit fichier bulk temporaire."""
+    bulk = tmp_path / "oracle-cards.json"
+    bulk.write_text(json.dumps([SOL_RING, DELVER]), encoding="utf-8")
+    catalog = CardCatalog(db_path=tmp_path / "catalog.db", bulk_path=bulk)
+    yield catalog
+    catalog.close()
+
+
+@pytest.fixture
+def http_cache(tmp_path):
+    """Cache HTTP isolé pour chaque test."""
+    cache = HttpCache(db_path=tmp_path / "http_cache.db")
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def no_catalog(tmp_path):
+    """Catalogue vide (aucun fichier bulk)."""
+    return CardCatalog(db_path=tmp_path / "none.db", bulk_path=tmp_path / "none.json")
+
+
+class _FakeResponse:
+    def __init__(self, payload, status_code=200, headers=None):
+        self._payload = payload
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = json.dumps(payload)
+        self.content = self.text.encode()
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+
+class _FakeClient:
+    """Transport factice : délègue GET/POST à des fonctions de test."""
+
+    def __init__(self, get=None, post=None):
+        self._get = get
+        self._post = post
+
+    def get(self, url, **kwargs):
+        if self._get is None:
+            raise AssertionError("appel réseau inattendu")
+        return self._get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        if self._post is None:
+            raise AssertionError("appel réseau inattendu")
+        return self._post(url, **kwargs)
+
+
+def test_catalog_lookup_by_id_and_name(catalog):
+    assert catalog.lookup(SOL_RING["id"])["name"] == "Sol Ring"
+    assert catalog.lookup(SOL_RING["id"].upper())["name"] == "Sol Ring"
+    assert catalog.lookup("  sol   RING ")["id"] == SOL_RING["id"]
+    assert catalog.lookup("Insectile Aberration")["id"] == DELVER["id"]
+    assert catalog.lookup("Unknown Card") is None
+
+
+def test_provider_answers_from_catalog_without_network(catalog, http_cache):
+    provider = ExternalDataProvider(catalog=catalog, http_cache=http_cache, http_client=_FakeClient())
+
+    assert provider.get_scryfall_data("Sol Ring")["id"] == SOL_RING["id"]
+    assert provider.get_card_cmc(SOL_RING["id"]) == 1.0
+    assert provider.get_image_url_from_scryfall(DELVER["id"]) == "https://img/delver-front.jpg"
+
+
+def test_batch_lookup_uses_one_request_per_75_identifiers(no_catalog, http_cache):
+    calls = []
+
+    def fake_post(url, json=None, **kwargs):
+        calls.append(json["identifiers"])
+        return _FakeResponse({"data": [
+            {"id": ident["id"], "name": f"Card {ident['id'][:4]}"} for ident in json["identifiers"]
+        ]})
+
+    provider = ExternalDataProvider(catalog=no_catalog, http_cache=http_cache, http_client=_FakeClient(post=fake_post))
+    ids = [f"{i:08x}-0000-0000-0000-000000000000" for i in range(160)]
+
+    results = provider.get_scryfall_data_batch(ids + ids[:10])
+
+    assert [len(c) for c in calls] == [75, 75, 10]
+    assert set(results) == set(ids)
+    # Les cartes résolues sont ensuite servies par le cache
+    provider.get_scryfall_data_batch(ids[:5])
+    assert len(calls) == 3
+
+
+def test_http_cache_survives_restart_and_revalidates(no_catalog, http_cache):
+    calls = []
+
+    def fake_get(url, params=None, headers=None, **kwargs):
+        calls.append(headers or {})
+        if headers and headers.get("If-None-Match") == '"v1"':
+            return _FakeResponse({}, status_code=304)
+        return _FakeResponse([], headers={"ETag": '"v1"'})
+
+    client = _FakeClient(get=fake_get)
+
+    ExternalDataProvider(catalog=no_catalog, http_cache=http_cache, http_client=client).load_archidekt_deck("42")
+    # Nouvelle instance, même cache disque : aucun appel réseau
+    restarted = HttpCache(db_path=http_cache.db_path)
+    ExternalDataProvider(catalog=no_catalog, http_cache=restarted, http_client=client).load_archidekt_deck("42")
+    assert len(calls) == 1
+
+    # Entrée expirée : revalidation conditionnelle (304)
+    restarted.ttls["archidekt"] = 0
+    ExternalDataProvider(catalog=no_catalog, http_cache=restarted, http_client=client).load_archidekt_deck("42")
+    assert calls[-1] == {"If-None-Match": '"v1"'}
+    restarted.close()
+
+
+def test_http_cache_evicts_least_recently_used(http_cache, monkeypatch):
+    monkeypatch.setattr("mtg.http_cache.ACCESS_TOUCH_INTERVAL", 0)
+    http_cache.max_bytes = 10
+    http_cache.put("a", "scryfall", "xxxx")
+    http_cache.put("b", "scryfall", "xxxx")
+    http_cache.get("a")
+    http_cache.put("c", "scryfall", "xxxx")
+
+    assert http_cache.get("b") is None
+    assert http_cache.get("a") is not None
+    assert http_cache.get("c") is not None
+
+
+def test_http_cache_keeps_a_running_size_total(http_cache):
+    def total():
+        return http_cache._get_connection().execute(
+            "SELECT value FROM http_cache_meta WHERE key = 'total_bytes'"
+        ).fetchone()[0]
+
+    http_cache.max_bytes = 10
+    http_cache.put("a", "scryfall", "xxxx")
+    http_cache.put("a", "scryfall", "xxxxxx")
+    http_cache.put("b", "scryfall", "xxxx")
+    assert total() == 10
+    http_cache.put("c", "scryfall", "xx")
+    assert http_cache.get("a") is None
+    assert total() == 6
+
+    # Cache antérieur au suivi du total : calculé une fois à l'ouverture
+    http_cache.close()
+    with http_cache._get_connection() as conn:
+        conn.execute("DELETE FROM http_cache_meta")
+    http_cache.close()
+    assert total() == 6
+    http_cache.clear()
+    assert total() == 0
+
+
+def test_http_cache_reads_only_touch_stale_access_times(http_cache):
+    http_cache.put("a", "scryfall", "xxxx")
+    conn = http_cache._get_connection()
+    changes = conn.total_changes
+    assert http_cache.get("a") is not None
+    assert conn.total_changes == changes
+
+    conn.execute("UPDATE http_cache SET accessed_at = 0 WHERE key = 'a'")
+    http_cache.get("a")
+    assert conn.execute("SELECT accessed_at FROM http_cache WHERE key = 'a'").fetchone()[0] > 0
+
+
+def test_deck_merge_is_independent_of_completion_order():
+    decks = [
+        {"Sol Ring": {"quantity": 1, "occurence": 1, "edhrec_rank": 1}, "Island": {"quantity": 30, "occurence": 1}},
+        {"Island": {"quantity": 25, "occurence": 1}, "Arcane Signet": {"quantity": 1, "occurence": 1}},
+        {"Sol Ring": {"quantity": 1, "occurence": 1, "edhrec_rank": 2}},
+    ]
+    in_order = ArchidektDeckMerger()
+    for idx, deck in enumerate(decks):
+        in_order.add(idx, deck)
+    reversed_order = ArchidektDeckMerger()
+    for idx in (2, 1, 0):
+        reversed_order.add(idx, decks[idx])
+
+    assert list(in_order.cards.items()) == list(reversed_order.cards.items())
+    assert list(in_order.cards) == ["Sol Ring", "Island", "Arcane Signet"]
+    assert in_order.cards["Sol Ring"] == {"quantity": 1, "occurence": 2, "edhrec_rank": 1}
+    assert in_order.cards["Island"]["quantity"] == 30
+
+
+def test_iter_archidekt_decks_yields_every_deck_with_its_rank(no_catalog, http_cache, monkeypatch):
+    provider = ExternalDataProvider(catalog=no_catalog, http_cache=http_cache, http_client=_FakeClient())
+    monkeypatch.setattr(provider, "load_archidekt_deck", lambda deck_id, updated_at=None: {f"Card {deck_id}": {"occurence": 1}})
+
+    results = dict(provider.iter_archidekt_decks(["10", "11", "12"], max_workers=3))
+
+    assert results == {0: {"Card 10": {"occurence": 1}}, 1: {"Card 11": {"occurence": 1}}, 2: {"Card 12": {"occurence": 1}}}
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=50)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.09
+
+
+def test_single_flight_shares_result_and_error():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        if len(calls) > 1:
+            raise RuntimeError("boom")
+        return "ok"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", slow))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while flight.stats()["calls"] < 4:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == ["ok"] * 4
+    assert flight.stats() == {"calls": 4, "executions": 1, "coalesced": 3}
+
+    # Nouvel appel une fois le premier terminé : l'erreur est partagée de même
+    release.clear()
+    errors = []
+
+    def failing():
+        try:
+            flight.do("k", slow)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=failing) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while flight.stats()["calls"] < 7:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 3 and len({id(e) for e in errors}) == 1
+    assert len(calls) == 2
+
+
+def test_concurrent_identical_lookups_hit_network_once(no_catalog, http_cache):
+    release = threading.Event()
+    calls = []
+
+    def fake_get(url, params=None, **kwargs):
+        calls.append(url)
+        release.wait(5)
+        return _FakeResponse(SOL_RING)
+
+    provider = ExternalDataProvider(catalog=no_catalog, http_cache=http_cache, http_client=_FakeClient(get=fake_get))
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(provider.get_scryfall_data, SOL_RING["id"]) for _ in range(5)]
+        while provider._scryfall_flight.stats()["calls"] < 5:
+            time.sleep(0.001)
+        release.set()
+        names = {future.result()["name"] for future in futures}
+
+    assert names == {"Sol Ring"}
+    assert len(calls) == 1
+    assert provider.get_scryfall_cache_stats()["coalesced"] == 4
+
+
+def test_http_client_retries_429_honouring_retry_after(monkeypatch):
+    responses = [_FakeResponse({}, status_code=429, headers={"Retry-After": "2"}), _FakeResponse({"ok": True})]
+    delays = []
+    client = HttpClient(max_retries=2)
+    session = client._session_for("api.scryfall.com")
+    monkeypatch.setattr(session, "request", lambda method, url, **kwargs: responses.pop(0))
+    monkeypatch.setattr("mtg.http_client.time.sleep", delays.append)
+
+    response = client.get("https://api.scryfall.com/cards/named")
+
+    assert response.json() == {"ok": True}
+    assert delays == [2.0]
+    assert client.stats.requests_by_host["api.scryfall.com"] == 2
+    assert client.stats.retries_by_host["api.scryfall.com"] == 1
+
+
+def test_transport_stats_are_thread_safe():
+    stats = TransportStats()
+    response = _FakeResponse({})
+    response.content = b"x" * 10
+
+    def record_many():
+        for _ in range(2000):
+            stats.record("api.scryfall.com", response)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for future in [pool.submit(record_many) for _ in range(8)]:
+            future.result()
+
+    assert stats.requests_by_host["api.scryfall.com"] == 16000
+    assert stats.bytes_by_host["api.scryfall.com"] == 160000
+
+
+@pytest.fixture
+def archidekt_server():
+    """Serveur HTTP local simulant l'endpoint des cartes d'un deck Archidekt."""
+    class Handler(BaseHTTPRequestHandler):
+        delay = 0.0
+
+        def do_GET(self):
+            time.sleep(Handler.delay)
+            deck_id = self.path.strip("/").split("/")[-2]
+            body = json.dumps([{"quantity": 1, "card": {"oracleCard": {
+                "name": f"Card {deck_id}", "uid": f"oracle-{deck_id}", "edhrecRank": 1, "defaultCategory": None,
+            }}}]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, Handler
+    server.shutdown()
+    server.server_close()
+
+
+def test_async_provider_against_local_server(no_catalog, http_cache, archidekt_server):
+    server, _ = archidekt_server
+    provider = ExternalDataProvider(
+        catalog=no_catalog, http_cache=http_cache, http_client=HttpClient(max_retries=0),
+        archidekt_api=f"http://127.0.0.1:{server.server_port}/api",
+    )
+    async_provider = AsyncExternalDataProvider(provider, max_concurrency=4)
+
+    async def collect():
+        return {idx: deck async for idx, deck in async_provider.iter_archidekt_decks(["1", "2", "3"])}
+
+    decks = asyncio.run(collect())
+    assert sorted(decks) == [0, 1, 2]
+    assert decks[2] == {"Card 3": {"oracle_id": "oracle-3", "quantity": 1, "edhrec_rank": 1,
+                                   "defaultCategory": None, "occurence": 1}}
+
+    facade = BlockingExternalDataProvider(async_provider)
+    try:
+        assert list(facade.load_archidekt_deck("7")) == ["Card 7"]
+        assert sorted(idx for idx, _ in facade.iter_archidekt_decks(["8", "9"])) == [0, 1]
+    finally:
+        facade.close()
+
+
+def test_async_provider_cancellation(no_catalog, http_cache, archidekt_server):
+    server, handler = archidekt_server
+    handler.delay = 0.5
+    provider = ExternalDataProvider(
+        catalog=no_catalog, http_cache=http_cache, http_client=HttpClient(max_retries=0),
+        archidekt_api=f"http://127.0.0.1:{server.server_port}/api",
+    )
+    async_provider = AsyncExternalDataProvider(provider, max_concurrency=1)
+
+    async def run():
+        task = asyncio.ensure_future(async_provider.load_archidekt_deck("1"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    start = time.monotonic()
+    asyncio.run(run())
+    assert time.monotonic() - start < 0.4
+    async_provider.close()
+
+
+def test_deck_store_only_downloads_new_or_changed_decks(no_catalog, http_cache, tmp_path, archidekt_server):
+    server, _ = archidekt_server
+    client = HttpClient(max_retries=0)
+    store = DeckStore(db_path=tmp_path / "decks.db")
+    provider = ExternalDataProvider(
+        catalog=no_catalog, http_cache=http_cache, http_client=client, deck_store=store,
+        archidekt_api=f"http://127.0.0.1:{server.server_port}/api",
+    )
+    host = f"127.0.0.1:{server.server_port}"
+
+    first = dict(provider.iter_archidekt_decks(["1", "2"], updated_at={"1": "2024-01-01", "2": "2024-01-01"}))
+    assert client.stats.requests_by_host[host] == 2
+
+    again = dict(provider.iter_archidekt_decks(["1", "2"], updated_at={"1": "2024-01-01", "2": "2024-02-01"}))
+    assert client.stats.requests_by_host[host] == 3
+    assert again == first
+    store.close()
+
+
+def test_deck_listing_streams_pages_until_target(no_catalog, http_cache):
+    pages = []
+
+    def fake_get(url, params=None, **kwargs):
+        page = params["page"]
+        pages.append(page)
+        ids = range((page - 1) * 3, page * 3)
+        return _FakeResponse({"count": 12, "next": f"page={page + 1}" if page < 4 else None,
+                              "results": [{"id": i, "updatedAt": "2024"} for i in ids]})
+
+    provider = ExternalDataProvider(catalog=no_catalog, http_cache=http_cache, http_client=_FakeClient(get=fake_get))
+    listing = provider.get_archidekt_deck_listing("Atraxa", "Vues", target=5)
+
+    assert [deck["id"] for deck in listing] == ["0", "1", "2", "3", "4"]
+    assert listing.total == 12
+    assert pages == [1, 2]
+    assert list(provider.get_archidekt_decks_id_for_commander("Atraxa", "Vues")) == [str(i) for i in range(12)]
+    # Listing toujours relu : les dates de mise à jour restent à jour
+    assert pages == [1, 2, 1, 2, 3, 4]
+
+
+def test_card_cache_projects_fields_and_evicts_lru():
+    cache = CardCache(max_entries=2, max_bytes=10_000)
+    full = dict(SOL_RING, prices={"usd": "1.00"}, legalities={"commander": "legal"},
+                image_uris={"normal": "https://img/n.jpg", "small": "https://img/s.jpg", "art_crop": "x"})
+
+    stored = cache.put("sol", full)
+    assert "prices" not in stored and "legalities" not in stored
+    assert stored["image_uris"] == {"normal": "https://img/n.jpg"}
+    assert cache.put("delver", DELVER)["card_faces"][1]["image_uris"] == {"normal": "https://img/delver-back.jpg"}
+
+    cache.get("sol")
+    cache.put("third", SOL_RING)
+    assert cache.get("delver") is None
+    assert cache.get("sol") is not None
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+
+def test_recorded_responses_replay_offline_with_throttling(no_catalog, tmp_path, archidekt_server, monkeypatch):
+    server, _ = archidekt_server
+    fixtures = tmp_path / "fixtures"
+    recorder = ExternalDataProvider(
+        catalog=no_catalog, http_cache=HttpCache(db_path=tmp_path / "record.db"),
+        http_client=make_recording_client(fixtures, max_retries=0),
+        archidekt_api=f"http://127.0.0.1:{server.server_port}/api",
+    )
+    recorded = dict(recorder.iter_archidekt_decks(["1", "2"]))
+    server.shutdown()
+
+    delays = []
+    client = make_replay_client(fixtures, ReplayConditions(throttle_rate=0.5, retry_after=0.01, seed=3), max_retries=10)
+    retry_delay = client._retry_delay
+    monkeypatch.setattr(client, "_retry_delay", lambda *args: delays.append(retry_delay(*args)) or delays[-1])
+    replayer = ExternalDataProvider(
+        catalog=no_catalog, http_cache=HttpCache(db_path=tmp_path / "replay.db"), http_client=client,
+        archidekt_api="http://archidekt.invalid/api",
+    )
+    assert dict(replayer.iter_archidekt_decks(["1", "2"])) == recorded
+    assert delays and set(delays) == {0.01}
+    assert client.stats.retries_by_host["archidekt.invalid"] == len(delays)
+
+    with ReplayServer(fixtures, conditions=ReplayConditions(latency=0.01)) as replay_server:
+        served = ExternalDataProvider(
+            catalog=no_catalog, http_cache=HttpCache(db_path=tmp_path / "served.db"),
+            http_client=HttpClient(max_retries=0), archidekt_api=f"{replay_server.url}/api",
+        )
+        assert served.load_archidekt_deck("2") == recorded[1]